@@ -0,0 +1,153 @@
+import os
+import io
+import sys
+import glob
+import argparse
+import contextlib
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tracking_core import main, load_measurements, iter_measurement_groups, TRANSITION_MODELS, ASSIGNMENT_SOLVERS
+
+
+# Expands the command-line inputs: directories contribute their *.csv files,
+# files are taken as given. Duplicates are dropped, the order is kept.
+def collect_input_files(paths):
+    input_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            input_files.extend(sorted(glob.glob(os.path.join(path, '*.csv'))))
+        elif os.path.isfile(path):
+            input_files.append(path)
+        else:
+            raise ValueError(f"Input '{path}' not found")
+    return list(dict.fromkeys(os.path.abspath(path) for path in input_files))
+
+
+# Per-file output names in output_dir, keyed by the input file stem. A stem
+# shared by inputs from different directories gets the lowest _2, _3, ...
+# suffix whose name is not issued yet, so no two inputs share an output.
+def output_paths(input_files, output_dir):
+    issued = set()
+    paths = []
+    for input_file in input_files:
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        name = stem
+        suffix = 1
+        while name in issued:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        issued.add(name)
+        prefix = os.path.join(output_dir, name)
+        paths.append({
+            'log_file_path': prefix + '_detailed_log.csv',
+            'summary_file_path': prefix + '_track_summary.csv',
+            'history_spill': prefix + '_history.bin',
+            'console': prefix + '_console.txt'
+        })
+    return paths
+
+
+# Passes streamed plot groups on to main, counting their plots into result
+def count_groups(groups, result):
+    for group in groups:
+        result['measurements'] += len(group)
+        yield group
+
+
+# Runs main on one file in a pool worker. The file is loaded (or, with
+# stream, grouped as it is read) here, so the measurement count is that of
+# the plots main actually processes. The console
+# output of main goes to the file's own console log so workers do not
+# interleave on stdout; errors are returned rather than raised so one bad file
+# does not stop the batch.
+def process_file(job):
+    input_file, paths, options = job
+    result = {'input_file': input_file, 'console': paths['console'], 'measurements': 0, 'tracks': 0,
+              'firm': 0, 'seconds': 0.0, 'error': None}
+    output = io.StringIO()
+    start = perf_counter()
+    try:
+        if options['stream']:
+            measurements = count_groups(iter_measurement_groups(input_file), result)
+        else:
+            measurements = load_measurements(input_file)
+            result['measurements'] = len(measurements)
+        with contextlib.redirect_stdout(output):
+            tracks = main(measurements, options['track_mode'], options['filter_option'], options['association_type'],
+                          k_best=options['k_best'], assignment_solver=options['assignment_solver'],
+                          history_depth=options['history_depth'],
+                          history_spill=paths['history_spill'] if options['spill_history'] else None,
+                          log_file_path=paths['log_file_path'], summary_file_path=paths['summary_file_path'])
+        result['tracks'] = len(tracks)
+        result['firm'] = sum(1 for track in tracks if track['current_state'] == 'Firm')
+    except Exception as error:
+        result['error'] = f"{type(error).__name__}: {error}"
+        output.write(f"\n{result['error']}\n")
+    result['seconds'] = perf_counter() - start
+    with open(paths['console'], 'w') as file:
+        file.write(output.getvalue())
+    return result
+
+
+def run_batch(input_files, output_dir, options, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(input_file, paths, options) for input_file, paths in zip(input_files, output_paths(input_files, output_dir))]
+    results = []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_file, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"FAILED {result['input_file']}: {result['error']} (see {result['console']})")
+            else:
+                print(f"{result['input_file']}: {result['measurements']} measurements, {result['tracks']} tracks "
+                      f"({result['firm']} Firm), {result['seconds']:.2f} s")
+    wall_seconds = perf_counter() - start
+
+    done = [result for result in results if not result['error']]
+    measurements = sum(result['measurements'] for result in done)
+    busy_seconds = sum(result['seconds'] for result in results)
+    print(f"Processed {len(done)} of {len(results)} files in {wall_seconds:.2f} s "
+          f"({len(results) - len(done)} failed)")
+    print(f"Measurements: {measurements}, tracks: {sum(result['tracks'] for result in done)}")
+    if wall_seconds > 0:
+        print(f"Throughput: {measurements / wall_seconds:.0f} measurements/s, {len(results) / wall_seconds:.2f} files/s, "
+              f"{busy_seconds / wall_seconds:.2f}x parallel speedup")
+    print(f"Outputs written to {output_dir}")
+    return results
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Run the tracker over many measurement files in parallel.")
+    parser.add_argument('inputs', nargs='+', help="Measurement CSV files or directories of them")
+    parser.add_argument('-o', '--output-dir', default='batch_output', help="Directory for the per-file outputs")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--track-mode', default='3-state', choices=['3-state', '5-state', '7-state'])
+    parser.add_argument('--filter', dest='filter_option', default='CV', choices=sorted(TRANSITION_MODELS))
+    parser.add_argument('--association', dest='association_type', default='JPDA', choices=['JPDA', 'Munkres', 'MHT'])
+    parser.add_argument('--assignment-solver', default='lsa', choices=sorted(ASSIGNMENT_SOLVERS))
+    parser.add_argument('--k-best', type=int, default=100)
+    parser.add_argument('--history-depth', type=int, default=1000)
+    parser.add_argument('--spill-history', action='store_true',
+                        help="Write track history beyond --history-depth to a per-file .bin")
+    parser.add_argument('--stream', action='store_true',
+                        help="Track plot groups while the file is still being read (time-ordered files only)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    try:
+        input_files = collect_input_files(arguments.inputs)
+    except ValueError as error:
+        sys.exit(str(error))
+    if not input_files:
+        sys.exit("No measurement files found.")
+    options = {key: getattr(arguments, key) for key in ('track_mode', 'filter_option', 'association_type', 'k_best',
+                                                         'assignment_solver', 'history_depth', 'spill_history',
+                                                         'stream')}
+    results = run_batch(input_files, arguments.output_dir, options, arguments.workers)
+    sys.exit(1 if any(result['error'] for result in results) else 0)
@@ -0,0 +1,2203 @@
+import numpy as np
+import csv
+import itertools
+import os
+import heapq
+from time import perf_counter
+from collections import deque
+# scipy is imported inside the functions that use it, so that importing the
+# core (e.g. in every batch worker) only loads NumPy
+
+
+# Closed-form forward/back substitution for stacked 3x3 Cholesky factors
+# L (..., 3, 3) against right-hand sides b (..., 3), so S is factorized once
+# and never inverted.
+def cholesky_forward(L, b):
+    y0 = b[..., 0] / L[..., 0, 0]
+    y1 = (b[..., 1] - L[..., 1, 0] * y0) / L[..., 1, 1]
+    y2 = (b[..., 2] - L[..., 2, 0] * y0 - L[..., 2, 1] * y1) / L[..., 2, 2]
+    return np.stack([y0, y1, y2], axis=-1)
+
+
+def cholesky_backward(L, y):
+    x2 = y[..., 2] / L[..., 2, 2]
+    x1 = (y[..., 1] - L[..., 2, 1] * x2) / L[..., 1, 1]
+    x0 = (y[..., 0] - L[..., 1, 0] * x1 - L[..., 2, 0] * x2) / L[..., 0, 0]
+    return np.stack([x0, x1, x2], axis=-1)
+
+
+def cholesky_solve(L, b):
+    # Solves S x = b with S = L L^T
+    return cholesky_backward(L, cholesky_forward(L, b))
+
+
+def cv_transition(dt):
+    T_2 = (dt * dt) / 2.0
+    T_3 = (dt * dt * dt) / 3.0
+    Phi = np.eye(6)
+    Q = np.eye(6)
+    for i in range(3):
+        Phi[i, i + 3] = dt
+        Q[i, i] = T_3
+        Q[i, i + 3] = T_2
+        Q[i + 3, i] = T_2
+        Q[i + 3, i + 3] = dt
+    return Phi, Q
+
+
+def ca_transition(dt):
+    T_2 = (dt * dt) / 2.0
+    T_3 = (dt * dt * dt) / 3.0
+    T_4 = (dt * dt * dt * dt) / 4.0
+    Phi = np.eye(9)
+    Q = np.eye(9)
+    for i in range(3):
+        Phi[i, i + 3] = dt
+        Phi[i, i + 6] = T_2
+        Q[i, i] = T_4
+        Q[i, i + 3] = T_3
+        Q[i + 3, i] = T_3
+        Q[i + 3, i + 3] = T_2
+        Q[i + 6, i + 6] = dt
+    return Phi, Q
+
+
+def ct_transition(dt):
+    T_2 = (dt * dt) / 2.0
+    T_3 = (dt * dt * dt) / 3.0
+    T_4 = (dt * dt * dt * dt) / 4.0
+    Phi = np.eye(12)
+    Q = np.eye(12)
+    for i in range(3):
+        Phi[i, i + 3] = dt
+        Phi[i, i + 6] = T_2
+        Phi[i, i + 9] = T_3
+        Q[i, i] = T_4
+        Q[i, i + 3] = T_3
+        Q[i + 3, i] = T_3
+        Q[i + 3, i + 3] = T_2
+        Q[i + 6, i + 6] = dt
+        Q[i + 9, i + 9] = T_2
+    return Phi, Q
+
+
+# Motion model -> (state dimension, unscaled Phi/Q builder)
+TRANSITION_MODELS = {
+    'CV': (6, cv_transition),
+    'CA': (9, ca_transition),
+    'CT': (12, ct_transition),
+}
+
+
+# Cache of the (Phi, Q) coefficients per motion model and plant noise. Every
+# entry of Phi and Q is a polynomial in dt of degree 4 at most, so the
+# coefficient matrices are fitted once from the model's builder and Phi/Q for a
+# whole array of dt values then come from one tensordot. Keying on dt itself
+# rarely repeats: each track's dt runs from its own last update, and plot
+# times are not on a fixed grid.
+class TransitionCache:
+    def __init__(self, degree=4):
+        self.degree = degree  # Highest power of dt in any Phi/Q entry
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def coefficients(self, model, plant_noise):
+        # (degree + 1, d, d) coefficient stacks of Phi and Q, lowest power first
+        key = (model, plant_noise)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        # Sampling the builder at degree + 1 steps determines the polynomials exactly
+        steps = np.arange(self.degree + 1, dtype=float)
+        samples = [TRANSITION_MODELS[model][1](step) for step in steps]
+        fit = np.linalg.inv(np.vander(steps, increasing=True))
+        Phi = np.tensordot(fit, np.stack([Phi for Phi, _ in samples]), axes=1)
+        Q = np.tensordot(fit, np.stack([Q for _, Q in samples]), axes=1)
+        # Real coefficients are 1, 1/2, 1/3 or 1/4; anything this small is round-off of the fit
+        Phi[np.abs(Phi) < 1e-9] = 0
+        Q[np.abs(Q) < 1e-9] = 0
+        entry = (Phi, Q * plant_noise)
+        self.entries[key] = entry
+        return entry
+
+    def get_batch(self, model, dt, plant_noise):
+        # Stacked (n, d, d) Phi and Q for an array of dt values
+        Phi, Q = self.coefficients(model, plant_noise)
+        powers = np.asarray(dt, dtype=float)[:, None] ** np.arange(self.degree + 1)
+        return np.tensordot(powers, Phi, axes=1), np.tensordot(powers, Q, axes=1)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Array-backed filter state for every live track. Each track owns one slot of
+# the stacked Sf (N, n) / Pf (N, n, n) arrays; slots come from a free list and
+# are handed back when the owning track_id_list entry is freed.
+class TrackStateStore:
+    def __init__(self, state_dim=6, capacity=64):
+        self.state_dim = state_dim
+        self.free_slots = list(range(capacity - 1, -1, -1))  # Stack, so allocate/free are O(1)
+        self.occupied = np.zeros(capacity, dtype=bool)
+        self.Sf = np.zeros((capacity, state_dim))  # Filter state vectors
+        self.Pf = np.tile(np.eye(state_dim), (capacity, 1, 1))  # Filter state covariance matrices
+        self.Sp = np.zeros((capacity, state_dim))  # Predicted state vectors
+        self.Pp = np.tile(np.eye(state_dim), (capacity, 1, 1))  # Predicted state covariance matrices
+        self.Meas_Time = np.zeros(capacity)  # Measured time
+        self.prev_Time = np.zeros(capacity)
+        self.Z1 = np.zeros((capacity, 3))  # First measurement, used for the velocity estimate
+        self.first_rep_flag = np.zeros(capacity, dtype=bool)
+        self.second_rep_flag = np.zeros(capacity, dtype=bool)
+        self.S_chol = np.zeros((capacity, 3, 3))  # Cholesky factor of the innovation covariance
+        self.factor_valid = np.zeros(capacity, dtype=bool)  # S_chol matches the current Pp
+        self.update_count = np.zeros(capacity, dtype=int)
+        self.last_report = np.zeros((capacity, 3))  # Cartesian position of the last associated report
+        self.last_doppler = np.zeros(capacity)  # Doppler of the last associated report
+        self.last_range = np.zeros(capacity)  # Measured range of the last associated report
+
+    def _grow(self):
+        # Double the capacity; only happens when every slot is taken
+        old_capacity = len(self.Sf)
+        capacity = 2 * old_capacity
+        for name in ('occupied', 'Sf', 'Sp', 'Meas_Time', 'prev_Time', 'Z1', 'first_rep_flag', 'second_rep_flag',
+                     'S_chol', 'factor_valid', 'update_count', 'last_report', 'last_doppler', 'last_range'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:old_capacity] = old
+            setattr(self, name, new)
+        for name in ('Pf', 'Pp'):
+            old = getattr(self, name)
+            new = np.tile(np.eye(self.state_dim), (capacity, 1, 1))
+            new[:old_capacity] = old
+            setattr(self, name, new)
+        self.free_slots.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def allocate(self):
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+        self.occupied[slot] = True
+        return slot
+
+    def clone(self, slots):
+        # New slots holding copies of the given slots' states (hypothesis branching)
+        slots = np.asarray(slots, dtype=int)
+        clones = np.array([self.allocate() for _ in range(len(slots))], dtype=int)
+        for name in ('Sf', 'Pf', 'Sp', 'Pp', 'Meas_Time', 'prev_Time', 'Z1', 'first_rep_flag', 'second_rep_flag',
+                     'S_chol', 'factor_valid', 'update_count', 'last_report', 'last_doppler', 'last_range'):
+            array = getattr(self, name)
+            array[clones] = array[slots]
+        return clones
+
+    def free(self, slot):
+        if not self.occupied[slot]:
+            return
+        self.reset(slot)
+        self.occupied[slot] = False
+        self.free_slots.append(slot)
+
+    def reset(self, slot):
+        self.Sf[slot] = 0
+        self.Sp[slot] = 0
+        self.Pf[slot] = np.eye(self.state_dim)
+        self.Pp[slot] = np.eye(self.state_dim)
+        self.Meas_Time[slot] = 0
+        self.prev_Time[slot] = 0
+        self.Z1[slot] = 0
+        self.first_rep_flag[slot] = False
+        self.second_rep_flag[slot] = False
+        self.factor_valid[slot] = False
+        self.update_count[slot] = 0
+        self.last_report[slot] = 0
+        self.last_doppler[slot] = 0
+        self.last_range[slot] = 0
+
+    def record_report(self, slot, position, doppler, measured_range):
+        # Keeps the last associated report of a track for range/Doppler correlation
+        self.last_report[slot] = position
+        self.last_doppler[slot] = doppler
+        self.last_range[slot] = measured_range
+
+    def live_slots(self):
+        return np.flatnonzero(self.occupied)
+
+
+# TrackStateStore slots of the entries of main's tracks list, in the same
+# order, so the store arrays of every track are gathered with one index
+# rather than a loop over the track entries. Appended to with tracks and
+# compacted when expired tracks are dropped from it.
+class TrackSlots:
+    def __init__(self, capacity=64):
+        self.buffer = np.zeros(capacity, dtype=int)
+        self.count = 0
+
+    def append(self, slot):
+        if self.count == len(self.buffer):
+            self.buffer = np.concatenate([self.buffer, np.zeros_like(self.buffer)])
+        self.buffer[self.count] = slot
+        self.count += 1
+
+    def keep(self, mask):
+        kept = self.slots[mask]
+        self.buffer[:len(kept)] = kept
+        self.count = len(kept)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def slots(self):
+        return self.buffer[:self.count]
+
+
+# Bounded per-track filter history. Sf/Sp and Pf/Pp of every update go into
+# preallocated arrays that grow up to `depth` entries and then wrap around, so
+# a long track holds at most depth entries. Covariances can be kept in full,
+# as their diagonal or as their upper triangle. Entries pushed out are dropped,
+# or written to `spill` (a binary file) as float64 records of
+# [track ID, update index, Sf, Sp, packed Pf, packed Pp].
+class TrackHistory:
+    def __init__(self, state_dim=6, depth=1000, covariance='full', spill=None, track_id=-1, capacity=8):
+        if covariance not in ('full', 'diagonal', 'upper'):
+            raise ValueError("Invalid covariance storage selected.")
+        self.state_dim = state_dim
+        self.depth = depth
+        self.covariance = covariance
+        self.spill = spill
+        self.track_id = track_id
+        if covariance == 'diagonal':
+            self.cov_index = np.diag_indices(state_dim)
+        elif covariance == 'upper':
+            self.cov_index = np.triu_indices(state_dim)
+        cov_size = {'full': state_dim * state_dim, 'diagonal': state_dim,
+                    'upper': state_dim * (state_dim + 1) // 2}[covariance]
+        capacity = min(capacity, depth)
+        self.states = np.zeros((capacity, 2, state_dim))  # Sf, Sp
+        self.covariances = np.zeros((capacity, 2, cov_size))  # Pf, Pp, packed
+        self.count = 0  # Updates recorded so far, including dropped ones
+
+    def __len__(self):
+        return min(self.count, self.depth)
+
+    @property
+    def start(self):
+        # Update index of the oldest entry still held
+        return self.count - len(self)
+
+    def pack(self, P):
+        return P.reshape(-1) if self.covariance == 'full' else P[self.cov_index]
+
+    def unpack(self, packed):
+        if self.covariance == 'full':
+            return packed.reshape(self.state_dim, self.state_dim).copy()
+        if self.covariance == 'diagonal':
+            return np.diag(packed)
+        P = np.zeros((self.state_dim, self.state_dim))
+        P[self.cov_index] = packed
+        P.T[self.cov_index] = packed
+        return P
+
+    def append(self, Sf, Sp, Pf, Pp):
+        if self.count >= self.depth:
+            if self.spill is not None:
+                row = self.count % self.depth
+                np.concatenate([[self.track_id, self.start], self.states[row].reshape(-1),
+                                self.covariances[row].reshape(-1)]).tofile(self.spill)
+        elif self.count == len(self.states):
+            # Grow by doubling until the depth is reached; nothing has wrapped yet
+            capacity = min(2 * len(self.states), self.depth)
+            for name in ('states', 'covariances'):
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:])
+                new[:len(old)] = old
+                setattr(self, name, new)
+        row = self.count % self.depth
+        self.states[row, 0] = Sf
+        self.states[row, 1] = Sp
+        self.covariances[row, 0] = self.pack(Pf)
+        self.covariances[row, 1] = self.pack(Pp)
+        self.count += 1
+
+    def entry(self, field, i):
+        row = (self.start + i) % self.depth
+        if field in ('Sf', 'Sp'):
+            return self.states[row, int(field == 'Sp')].reshape(-1, 1).copy()
+        return self.unpack(self.covariances[row, int(field == 'Pp')])
+
+    def view(self, field):
+        return HistoryView(self, field)
+
+
+# Read-only list view of one field of a TrackHistory, oldest entry first, so
+# track['Sf'][-1], slices, iteration and printing work as on a list
+class HistoryView:
+    def __init__(self, history, field):
+        self.history = history
+        self.field = field
+
+    def __len__(self):
+        return len(self.history)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.history.entry(self.field, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self.history.entry(self.field, index)
+
+    def __iter__(self):
+        return (self.history.entry(self.field, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# CV/CA/CT filter for many tracks at once: predicts and updates a whole array
+# of TrackStateStore slots with a few NumPy calls instead of one filter object
+# per track.
+class BatchKalmanFilter:
+    def __init__(self, store, model='CV', cache=None):
+        self.store = store
+        self.model = model
+        self.cache = cache if cache is not None else TransitionCache()
+        self.plant_noise = 20  # Plant noise covariance
+        self.H = np.eye(3, store.state_dim)  # Measurement matrix
+        self.R = np.eye(3)  # Measurement noise covariance
+        self.gate_threshold = 900.21  # 95% confidence interval for [Chi-squared distribution](https://en.wikipedia.org/wiki/Chi-squared_distribution) with 3 degrees of freedom
+        self.joseph_min_updates = 50  # Joseph-form Pf for tracks with this many updates (None disables)
+
+    def initialize_filter_state(self, slot, x, y, z, vx, vy, vz, time):
+        store = self.store
+        if not store.first_rep_flag[slot]:
+            store.Z1[slot] = (x, y, z)
+            store.Sf[slot, :3] = (x, y, z)
+            store.Meas_Time[slot] = time
+            store.prev_Time[slot] = time
+            store.first_rep_flag[slot] = True
+        elif not store.second_rep_flag[slot]:
+            # Two-point start: the state moves to the second plot with the velocity between both
+            dt = time - store.prev_Time[slot]
+            store.Sf[slot, 3:6] = (np.array([x, y, z]) - store.Z1[slot]) / dt
+            store.Sf[slot, :3] = (x, y, z)
+            store.prev_Time[slot] = time
+            store.Meas_Time[slot] = time
+            store.second_rep_flag[slot] = True
+        else:
+            store.Meas_Time[slot] = time
+
+    def predict_step(self, slots, current_time):
+        store = self.store
+        slots = np.asarray(slots, dtype=int)
+        if len(slots) == 0:
+            return
+        dt = current_time - store.prev_Time[slots]
+        Phi, Q = self.cache.get_batch(self.model, dt, self.plant_noise)
+        store.Sp[slots] = np.einsum('nij,nj->ni', Phi, store.Sf[slots])
+        store.Pp[slots] = Phi @ store.Pf[slots] @ Phi.transpose(0, 2, 1) + Q
+        store.Meas_Time[slots] = current_time
+        store.factor_valid[slots] = False
+
+    def factorize(self, slots):
+        # One Cholesky factorization of S = H Pp H^T + R per slot and predict;
+        # gating, likelihoods and the gain all reuse it
+        store = self.store
+        slots = np.unique(np.asarray(slots, dtype=int))
+        slots = slots[~store.factor_valid[slots]]
+        if len(slots) == 0:
+            return
+        S = store.Pp[slots, :3, :3] + self.R
+        store.S_chol[slots] = np.linalg.cholesky(S)
+        store.factor_valid[slots] = True
+
+    def gain(self, slots):
+        # K^T = S^-1 H Pp, solved column by column against the cached factor
+        store = self.store
+        self.factorize(slots)
+        return cholesky_solve(store.S_chol[slots][:, None], store.Pp[slots, :3, :].transpose(0, 2, 1))
+
+    def posterior_covariance(self, slots, K, Pp):
+        Pf = Pp - K @ Pp[:, :3, :]
+        if self.joseph_min_updates is not None:
+            joseph = self.store.update_count[slots] >= self.joseph_min_updates
+            if joseph.any():
+                # (I - KH) Pp (I - KH)^T + K R K^T stays symmetric positive definite on long tracks
+                I_KH = np.eye(self.store.state_dim) - K[joseph] @ self.H
+                Pf[joseph] = (I_KH @ Pp[joseph] @ I_KH.transpose(0, 2, 1)
+                              + K[joseph] @ self.R @ K[joseph].transpose(0, 2, 1))
+        return Pf
+
+    def update_step(self, slots, Z):
+        store = self.store
+        slots = np.asarray(slots, dtype=int)
+        if len(slots) == 0:
+            return
+        Z = np.asarray(Z, dtype=float).reshape(len(slots), 3)
+        K = self.gain(slots)
+        Sp = store.Sp[slots]
+        Inn = Z - Sp[:, :3]  # H selects the position part of the state
+        store.Sf[slots] = Sp + np.einsum('nij,nj->ni', K, Inn)
+        store.Pf[slots] = self.posterior_covariance(slots, K, store.Pp[slots])
+        store.prev_Time[slots] = store.Meas_Time[slots]
+        store.update_count[slots] += 1
+
+    def pda_update_step(self, slots, Z, beta):
+        # JPDA update: Z is (n, k, 3) gated reports per slot, beta (n, k) their
+        # association probabilities (zero-padded); 1 - sum(beta) is the
+        # probability that none of them came from the track
+        store = self.store
+        slots = np.asarray(slots, dtype=int)
+        if len(slots) == 0:
+            return
+        Z = np.asarray(Z, dtype=float).reshape(len(slots), -1, 3)
+        beta = np.asarray(beta, dtype=float).reshape(len(slots), -1)
+        beta_miss = 1 - beta.sum(axis=1)
+        K = self.gain(slots)
+        Sp = store.Sp[slots]
+        Pp = store.Pp[slots]
+        Inn = Z - Sp[:, None, :3]
+        combined = np.einsum('nk,nki->ni', beta, Inn)
+        store.Sf[slots] = Sp + np.einsum('nij,nj->ni', K, combined)
+        # Spread of the innovations around the combined one
+        spread = np.einsum('nk,nki,nkj->nij', beta, Inn, Inn) - combined[:, :, None] * combined[:, None, :]
+        Pc = self.posterior_covariance(slots, K, Pp)
+        store.Pf[slots] = (beta_miss[:, None, None] * Pp + (1 - beta_miss)[:, None, None] * Pc
+                           + K @ spread @ K.transpose(0, 2, 1))
+        store.prev_Time[slots] = store.Meas_Time[slots]
+        store.update_count[slots] += 1
+
+
+# Measurement field -> column name in the recording header (ttk.csv layout)
+MEASUREMENT_COLUMNS = (
+    ('mr', 'MR'),  # Range
+    ('ma', 'MA'),  # Azimuth
+    ('me', 'ME'),  # Elevation
+    ('mt', 'MT'),  # Time
+    ('md', 'doppler'),
+)
+
+MEASUREMENT_DTYPE = np.dtype([(field, 'f8') for field, _ in MEASUREMENT_COLUMNS] +
+                             [('x', 'f8'), ('y', 'f8'), ('z', 'f8')])
+
+
+def parse_columns(body, usecols):
+    # (rows, len(usecols)) floats from the usecols fields of CSV rows given as
+    # bytes; NaN where a field is empty or a row is too short. The text is only
+    # scanned for separators: the wanted fields are located by their separator
+    # index within each line, copied out into fixed-width strings and converted
+    # one column at a time. The other columns are never tokenized.
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    text = np.frombuffer(body, dtype=np.uint8)
+    newline = text == ord('\n')
+    separators = np.flatnonzero(newline | (text == ord(',')))
+    line_ends = np.flatnonzero(newline[separators])  # Index of every line's last separator
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    n_fields = line_ends - line_starts + 1
+
+    columns = np.full((len(line_ends), len(usecols)), np.nan)
+    for c, column in enumerate(usecols):
+        lines = np.flatnonzero(column < n_fields)
+        field = line_starts[lines] + column  # Separator that ends the field
+        ends = separators[field]
+        starts = np.where(field > 0, separators[np.maximum(field - 1, 0)] + 1, 0)
+        width = int((ends - starts).max(initial=0))
+        if width == 0:
+            continue
+        offsets = starts[:, None] + np.arange(width)
+        chars = np.where(offsets < ends[:, None], text[np.minimum(offsets, len(text) - 1)], 0).astype(np.uint8)
+        filled = (chars > ord(' ')).any(axis=1)  # Blank fields stay NaN
+        columns[lines[filled], c] = chars[filled].view(f'S{width}')[:, 0].astype(float)
+    return columns
+
+
+def measurement_columns(header, file_path=''):
+    # Indices of the MEASUREMENT_COLUMNS in a recording header line
+    names = [name.strip().lstrip('%') for name in header.split(',')]
+    lookup = {name.lower(): i for i, name in enumerate(names)}
+    lookup.update({name: i for i, name in enumerate(names)})
+    usecols = []
+    for field, column in MEASUREMENT_COLUMNS:
+        index = lookup.get(column, lookup.get(column.lower()))
+        if index is None:
+            raise ValueError(f"Column '{column}' not found in {file_path}")
+        usecols.append(index)
+    return usecols
+
+
+def parse_measurements(body, usecols):
+    # Parses CSV rows (bytes, without header) into a MEASUREMENT_DTYPE array
+    if not body.strip():
+        return np.zeros(0, dtype=MEASUREMENT_DTYPE)
+
+    columns = parse_columns(body, usecols)
+    columns = columns[~np.isnan(columns).any(axis=1)]  # Drop plots with a missing MR/MA/ME/MT/doppler
+
+    measurements = np.zeros(len(columns), dtype=MEASUREMENT_DTYPE)
+    for i, (field, _) in enumerate(MEASUREMENT_COLUMNS):
+        measurements[field] = columns[:, i]
+    # Convert spherical to Cartesian coordinates
+    measurements['x'], measurements['y'], measurements['z'] = sph2cart(measurements['ma'], measurements['me'],
+                                                                       measurements['mr'])
+    return measurements
+
+
+def load_measurements(file_path):
+    # Columnar loader: resolves the columns by header name, parses only those
+    # columns and converts the whole file to Cartesian at once. Plots are
+    # returned in time order.
+    with open(file_path, 'rb') as file:
+        header, _, body = file.read().partition(b'\n')
+
+    measurements = parse_measurements(body, measurement_columns(header.decode(), file_path))
+    if np.any(np.diff(measurements['mt']) < 0):
+        measurements = np.sort(measurements, order='mt', kind='stable')
+    return measurements
+
+
+def iter_measurement_chunks(file_path, chunk_size=65536):
+    # Same as load_measurements, but parses chunk_size rows at a time while the file is read
+    with open(file_path, 'rb') as file:
+        usecols = measurement_columns(file.readline().decode(), file_path)
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+            if not lines:
+                break
+            yield parse_measurements(b''.join(lines), usecols)
+
+
+def measurement_positions(measurements):
+    # (n, 3) Cartesian positions cached in a MEASUREMENT_DTYPE array, without another sph2cart
+    return np.stack([measurements['x'], measurements['y'], measurements['z']], axis=-1)
+
+
+# Every plot main has taken in, as one MEASUREMENT_DTYPE array that the
+# tracks' row indices point into. A loaded recording is used as it is;
+# streamed groups are appended as they arrive, into a buffer that doubles
+# when full.
+class MeasurementIngest:
+    def __init__(self, array=None, capacity=65536):
+        self.buffer = np.zeros(capacity, dtype=MEASUREMENT_DTYPE) if array is None else array
+        self.count = 0 if array is None else len(array)
+
+    def append(self, group):
+        # Row of the group's first plot
+        start = self.count
+        if start + len(group) > len(self.buffer):
+            buffer = np.zeros(max(2 * len(self.buffer), start + len(group)), dtype=MEASUREMENT_DTYPE)
+            buffer[:start] = self.buffer[:start]
+            self.buffer = buffer
+        self.buffer[start:start + len(group)] = group
+        self.count += len(group)
+        return start
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def array(self):
+        return self.buffer[:self.count]
+
+
+# The plots of one track, kept as row indices into the MeasurementIngest
+# array (which also caches every plot's Cartesian position) and the code of
+# the track state each plot was taken in. Reads look like the old list of
+# ((mr, ma, me, mt, md, x, y, z), state) pairs; times and positions come
+# straight from the ingest columns.
+class TrackMeasurements:
+    def __init__(self, ingest, rows=(), states=(), capacity=8):
+        self.ingest = ingest
+        self.row_buffer = np.zeros(max(capacity, len(rows)), dtype=np.int64)
+        self.state_buffer = np.zeros(len(self.row_buffer), dtype=np.int8)
+        self.count = 0
+        for row, state in zip(rows, states):
+            self.append(row, state)
+
+    def append(self, row, state):
+        if self.count == len(self.row_buffer):
+            self.row_buffer = np.concatenate([self.row_buffer, np.zeros_like(self.row_buffer)])
+            self.state_buffer = np.concatenate([self.state_buffer, np.zeros_like(self.state_buffer)])
+        self.row_buffer[self.count] = row
+        self.state_buffer[self.count] = TRACK_STATE_CODES[state]
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def array(self):
+        return self.ingest.array
+
+    @property
+    def rows(self):
+        return self.row_buffer[:self.count]
+
+    @property
+    def times(self):
+        return self.array['mt'][self.rows]
+
+    @property
+    def positions(self):
+        return measurement_positions(self.array[self.rows])
+
+    @property
+    def last_position(self):
+        return measurement_positions(self.array[self.row_buffer[self.count - 1]])
+
+    @property
+    def last_time(self):
+        return self.array['mt'][self.row_buffer[self.count - 1]].item()
+
+    def entry(self, i):
+        return self.array[self.row_buffer[i]].item(), TRACK_STATES[self.state_buffer[i]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("measurement index out of range")
+        return self.entry(index)
+
+    def __iter__(self):
+        return (self.entry(i) for i in range(self.count))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# sph2cart/cart2sph take scalars or whole arrays. Azimuth is in degrees,
+# clockwise from the y axis and wrapped to [0, 360). With out=, results are
+# written into a preallocated (3, ...) buffer which is returned.
+def sph2cart(az, el, r, out=None):
+    az = np.radians(az)
+    el = np.radians(el)
+    if out is None:
+        x = r * np.cos(el) * np.sin(az)
+        y = r * np.cos(el) * np.cos(az)
+        z = r * np.sin(el)
+        return x, y, z
+
+    np.multiply(r, np.cos(el), out=out[1])
+    np.multiply(out[1], np.sin(az), out=out[0])
+    np.multiply(out[1], np.cos(az), out=out[1])
+    np.multiply(r, np.sin(el), out=out[2])
+    return out
+
+
+def cart2sph(x, y, z, out=None):
+    # (range, azimuth, elevation); the tracker itself only converts to
+    # Cartesian, this inverse is kept as public API for callers of the module
+    scalar = out is None and np.ndim(x) == 0
+    x, y, z = np.atleast_1d(x, y, z)
+    if out is None:
+        out = np.empty((3,) + x.shape)
+    horizontal = np.hypot(x, y)
+    np.hypot(horizontal, z, out=out[0])
+    np.degrees(np.arctan2(x, y), out=out[1])
+    np.mod(out[1], 360.0, out=out[1])
+    np.degrees(np.arctan2(z, horizontal), out=out[2])
+
+    if scalar:
+        return float(out[0, 0]), float(out[1, 0]), float(out[2, 0])
+    return out
+
+
+def measurement_group_offsets(times, max_time_diff=0.050):
+    # Group boundaries over time-ordered plots: group g is
+    # [offsets[g], offsets[g + 1]). A group holds every plot within
+    # max_time_diff of its first plot.
+    times = np.asarray(times)
+    n = len(times)
+    if n == 0:
+        return np.zeros(1, dtype=np.intp)
+
+    # A gap wider than the window always starts a new group
+    run_starts = np.concatenate(([0], np.flatnonzero(np.diff(times) > max_time_diff) + 1))
+    run_ends = np.append(run_starts[1:], n)
+
+    # Runs spanning more than the window are split from their first plot with searchsorted
+    splits = []
+    for start, end in zip(run_starts, run_ends):
+        if times[end - 1] - times[start] <= max_time_diff:
+            continue
+        while start < end:
+            start = np.searchsorted(times, times[start] + max_time_diff, side='right')
+            if start < end:
+                splits.append(start)
+
+    offsets = np.union1d(run_starts, splits).astype(np.intp)
+    return np.append(offsets, n)
+
+
+def iter_measurement_groups(file_path, max_time_diff=0.050, chunk_size=65536):
+    # Streaming variant for time-ordered recordings: yields each group as a
+    # zero-copy view into the chunk it was parsed from. Only the last, possibly
+    # unfinished, group of a chunk is carried over into the next one.
+    pending = np.zeros(0, dtype=MEASUREMENT_DTYPE)
+    for chunk in iter_measurement_chunks(file_path, chunk_size):
+        if not len(chunk):  # Every plot of the chunk was dropped
+            continue
+        if len(pending):
+            chunk = np.concatenate((pending, chunk))
+        offsets = measurement_group_offsets(chunk['mt'], max_time_diff)
+        for start, end in zip(offsets[:-2], offsets[1:-1]):
+            yield chunk[start:end]
+        pending = chunk[offsets[-2]:]
+
+    if len(pending):
+        yield pending
+
+
+# Per-scan gating stage. Every track is predicted to the scan time once, its
+# innovation covariance S = H Pp H^T + R factorized once, and all candidate
+# (track, report) pairs are then scored together against the predicted positions.
+class ScanGate:
+    def __init__(self, kalman_filter, track_slots, current_time, track_ids=None):
+        self.kalman_filter = kalman_filter
+        self.track_slots = np.asarray(track_slots, dtype=int)
+        # Stable ID of the track behind each gate index
+        self.track_ids = np.arange(len(self.track_slots)) if track_ids is None else np.asarray(track_ids)
+        self.gate_threshold = kalman_filter.gate_threshold
+        kalman_filter.predict_step(self.track_slots, current_time)
+        kalman_filter.factorize(self.track_slots)
+
+        store = kalman_filter.store
+        self.positions = store.Sp[self.track_slots, :3]  # Predicted positions (T, 3)
+        L = store.S_chol[self.track_slots]
+        # Rows of L^-1, so that |L^-1 r|^2 is the squared Mahalanobis distance
+        self.whitening = cholesky_forward(L[:, None], np.eye(3)).transpose(0, 2, 1)
+        self.half_log_det = np.log(np.diagonal(L, axis1=-2, axis2=-1)).sum(axis=-1)
+        # Radius of a sphere that contains the whole gate: gate_threshold * trace(S) >= gate_threshold * max eigenvalue
+        self.radii = np.sqrt(self.gate_threshold * np.sum(L * L, axis=(1, 2)))
+
+    def __len__(self):
+        return len(self.track_slots)
+
+    def candidates(self, reports):
+        # Coarse spatial pre-gate: a KD-tree over the report positions returns
+        # the reports inside every track's bounding sphere, as index arrays
+        if len(self) == 0 or len(reports) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+        from scipy.spatial import cKDTree
+        neighbours = cKDTree(np.asarray(reports, dtype=float)).query_ball_point(self.positions, self.radii)
+        counts = [len(n) for n in neighbours]
+        track_idx = np.repeat(np.arange(len(self)), counts)
+        report_idx = np.fromiter(itertools.chain.from_iterable(neighbours), dtype=int, count=sum(counts))
+        return track_idx, report_idx
+
+    def distances(self, track_idx, report_positions):
+        # Squared Mahalanobis distances of (k, 3) reports from their tracks' predictions, in one einsum
+        residuals = np.asarray(report_positions, dtype=float) - self.positions[track_idx]
+        y = np.einsum('kij,kj->ki', self.whitening[track_idx], residuals)
+        return np.sum(y * y, axis=-1)
+
+    def log_likelihood(self, track_idx, distances):
+        return -0.5 * distances - self.half_log_det[track_idx] - 1.5 * np.log(2 * np.pi)
+
+    def score(self, reports, candidates=None):
+        return PairScores(self, reports, candidates)
+
+
+# Per-scan pair cache. Every candidate (track, report) pair the spatial index
+# lets through is scored once: squared Mahalanobis distance, log-likelihood
+# and gate flag. Gating, clustering, every association strategy and the CSV
+# log read the scores from here instead of recomputing residuals. candidates
+# optionally gives the (track, report) arrays to score, already narrowed from
+# the spatial index's candidates (see GateCascade.score).
+class PairScores:
+    def __init__(self, gate, reports, candidates=None):
+        self.gate = gate
+        self.n_reports = len(reports)
+        self.candidate_tracks, self.candidate_reports = gate.candidates(reports) if candidates is None else candidates
+        self.candidate_distances = np.zeros(0)
+        if len(self.candidate_tracks):
+            self.candidate_distances = gate.distances(self.candidate_tracks,
+                                                      np.asarray(reports, dtype=float)[self.candidate_reports])
+        self.candidate_log_likelihood = gate.log_likelihood(self.candidate_tracks, self.candidate_distances)
+        self.gated = self.candidate_distances < gate.gate_threshold
+
+        # Gated pairs, the ones every association strategy works on
+        self.track_idx = self.candidate_tracks[self.gated]
+        self.report_idx = self.candidate_reports[self.gated]
+        self.distances = self.candidate_distances[self.gated]
+        self.log_likelihood = self.candidate_log_likelihood[self.gated]
+
+        # Candidate (track, report) keys and their sort order, for single-pair lookups
+        self.keys = self.candidate_tracks * self.n_reports + self.candidate_reports
+        self.key_order = np.argsort(self.keys, kind='stable')
+        self._clusters = None
+        self._cluster_pairs = None
+
+    def __len__(self):
+        return len(self.track_idx)
+
+    @property
+    def clusters(self):
+        if self._clusters is None:
+            self._clusters = clusters_from_pairs(self.track_idx, self.report_idx, len(self.gate), self.n_reports)
+        return self._clusters
+
+    @property
+    def cluster_pairs(self):
+        # Gated pair indices of every cluster
+        if self._cluster_pairs is None:
+            self._cluster_pairs = cluster_pairs(self.clusters, self.track_idx, len(self.gate))
+        return self._cluster_pairs
+
+    def lookup(self, track, report):
+        # (distance, log-likelihood, gated) of one pair, or None if the spatial pre-gate dropped it
+        key = track * self.n_reports + report
+        position = np.searchsorted(self.keys, key, sorter=self.key_order)
+        if position == len(self.keys) or self.keys[self.key_order[position]] != key:
+            return None
+        candidate = self.key_order[position]
+        return (self.candidate_distances[candidate].item(), self.candidate_log_likelihood[candidate].item(),
+                self.gated[candidate].item())
+
+
+# Cascaded range/Doppler gating. Pairs are tested on the raw measured range
+# and Doppler, which needs no coordinate conversion, before the 3D test. For a
+# scan, the candidate pairs of the gate's KD-tree go through the range and
+# Doppler tests and only the survivors reach the Mahalanobis gate. For a single
+# plot, a sorted search gives every track's window of reports within
+# range_threshold, then Doppler and the Cartesian distance are checked.
+# Pairs rejected at every stage are counted, for tuning the thresholds.
+class GateCascade:
+    STAGES = ('spatial', 'range', 'doppler', 'distance', 'mahalanobis')
+
+    def __init__(self, doppler_threshold=100, range_threshold=100):
+        self.doppler_threshold = doppler_threshold
+        self.range_threshold = range_threshold
+        self.tested = 0  # Pairs entering the cascade
+        self.rejected = dict.fromkeys(self.STAGES, 0)
+        self.accepted = 0
+
+    def doppler_stage(self, track_doppler, report_doppler, track_idx, report_idx):
+        inside = np.abs(np.asarray(track_doppler)[track_idx] - np.asarray(report_doppler)[report_idx]) < \
+            self.doppler_threshold
+        self.rejected['doppler'] += np.count_nonzero(~inside)
+        return track_idx[inside], report_idx[inside]
+
+    def pre_gate(self, track_ranges, track_doppler, report_ranges, report_doppler):
+        # (track index, report index) arrays of the pairs passing the range and Doppler stages
+        track_ranges = np.asarray(track_ranges, dtype=float)
+        report_ranges = np.asarray(report_ranges, dtype=float)
+        order = np.argsort(report_ranges, kind='stable')
+        sorted_ranges = report_ranges[order]
+        low = np.searchsorted(sorted_ranges, track_ranges - self.range_threshold, side='right')
+        high = np.searchsorted(sorted_ranges, track_ranges + self.range_threshold, side='left')
+        counts = np.maximum(high - low, 0)
+        track_idx = np.repeat(np.arange(len(track_ranges)), counts)
+        starts = np.repeat(low - np.cumsum(counts) + counts, counts)
+        report_idx = order[starts + np.arange(len(track_idx))]
+
+        self.tested += len(track_ranges) * len(report_ranges)
+        self.rejected['range'] += len(track_ranges) * len(report_ranges) - len(track_idx)
+        return self.doppler_stage(track_doppler, report_doppler, track_idx, report_idx)
+
+    def score(self, gate, reports, report_ranges, report_doppler):
+        # PairScores of a scan: the gate's KD-tree candidates, narrowed by the
+        # range and Doppler stages, with the Mahalanobis gate run only on the rest
+        store = gate.kalman_filter.store
+        track_idx, report_idx = gate.candidates(reports)
+        self.tested += len(gate) * len(reports)
+        self.rejected['spatial'] += len(gate) * len(reports) - len(track_idx)
+
+        track_ranges = np.linalg.norm(gate.positions, axis=1)
+        in_range = np.abs(track_ranges[track_idx] - np.asarray(report_ranges, dtype=float)[report_idx]) < \
+            self.range_threshold
+        self.rejected['range'] += np.count_nonzero(~in_range)
+        candidates = self.doppler_stage(store.last_doppler[gate.track_slots], report_doppler, track_idx[in_range],
+                                        report_idx[in_range])
+
+        pairs = gate.score(reports, candidates)
+        self.rejected['mahalanobis'] += np.count_nonzero(~pairs.gated)
+        self.accepted += len(pairs)
+        return pairs
+
+    def nearest(self, last_ranges, last_positions, last_doppler, measured_range, position, doppler):
+        # Single plot: index of the track whose last report is nearest among
+        # those passing every stage, or -1 if none correlates
+        track_idx, _ = self.pre_gate(last_ranges, last_doppler, [measured_range], [doppler])
+        offsets = np.asarray(last_positions, dtype=float)[track_idx] - np.asarray(position, dtype=float)
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        inside = distances < self.range_threshold ** 2
+        self.rejected['distance'] += np.count_nonzero(~inside)
+        self.accepted += np.count_nonzero(inside)
+        if not inside.any():
+            return -1
+        candidates = np.flatnonzero(inside)
+        return track_idx[candidates[np.argmin(distances[candidates])]].item()
+
+    def summary(self):
+        rejected = ', '.join(f"{stage} {count}" for stage, count in self.rejected.items())
+        return f"{self.tested} pairs tested, rejected: {rejected}, accepted {self.accepted}"
+
+
+# Union-find over track nodes 0..T-1 and report nodes T..T+R-1, with path
+# halving and union by size
+class DisjointSet:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def clusters_from_pairs(track_idx, report_idx, n_tracks, n_reports):
+    # Connected components of the gated (track, report) pairs, returned as
+    # (track index array, report index array) per cluster
+    track_idx = np.asarray(track_idx, dtype=int)
+    report_idx = np.asarray(report_idx, dtype=int)
+    if len(track_idx) == 0:
+        return []
+
+    sets = DisjointSet(n_tracks + n_reports)
+    for t, r in zip(track_idx.tolist(), (report_idx + n_tracks).tolist()):
+        sets.union(t, r)
+
+    nodes = np.union1d(track_idx, report_idx + n_tracks)  # Only nodes that take part in a gated pair
+    roots = np.array([sets.find(node) for node in nodes.tolist()])
+    order = np.argsort(roots, kind='stable')
+    nodes, roots = nodes[order], roots[order]
+    bounds = np.flatnonzero(np.diff(roots)) + 1
+
+    clusters = []
+    for members in np.split(nodes, bounds):
+        is_track = members < n_tracks
+        clusters.append((members[is_track], members[~is_track] - n_tracks))
+    return clusters
+
+
+def cluster_pairs(clusters, track_idx, n_tracks):
+    # Indices of the gated pairs that fall in each cluster, found through their track
+    track_cluster = np.zeros(n_tracks, dtype=int)
+    for c, (cluster_tracks, _) in enumerate(clusters):
+        track_cluster[cluster_tracks] = c
+    order = np.argsort(track_cluster[track_idx], kind='stable')
+    bounds = np.searchsorted(track_cluster[track_idx][order], np.arange(len(clusters) + 1))
+    return [order[bounds[c]:bounds[c + 1]] for c in range(len(clusters))]
+
+
+def select_initiation_mode(mode):
+    if mode == '3-state':
+        return 3
+    elif mode == '5-state':
+        return 5
+    elif mode == '7-state':
+        return 7
+    else:
+        raise ValueError("Invalid mode selected.")
+
+
+CONFIRMATION_STATES = {
+    3: ['Poss1', 'Tentative1', 'Firm'],
+    5: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Firm'],
+    7: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
+}
+TRACK_STATES = CONFIRMATION_STATES[7]
+TRACK_STATE_CODES = {state: code for code, state in enumerate(TRACK_STATES)}
+
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values):
+    # Set bits of every element of a uint64 array, through a byte lookup table
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return POPCOUNT_TABLE[values.view(np.uint8)].reshape(len(values), 8).sum(axis=1)
+
+
+# Track confirmation as a table-driven M-of-N state machine over arrays
+# indexed by track ID. Every track keeps hit and miss counters and a bitmask
+# of its last `window` association chances (1 = hit). From state i a track
+# moves to next_state[i] once required_hits[i] of those bits are set, and
+# straight to Firm with firm_hits; one step per update. Only the tracks
+# touched in a scan go through step(), all at once.
+class ConfirmationEngine:
+    def __init__(self, firm_threshold, window=32, capacity=64):
+        if not 0 < window <= 64:
+            raise ValueError("The confirmation window must hold 1 to 64 chances.")
+        self.states = CONFIRMATION_STATES[firm_threshold]
+        n_states = len(self.states)
+        self.firm = n_states - 1
+        self.next_state = np.minimum(np.arange(n_states) + 1, self.firm)
+        self.required_hits = np.arange(1, n_states + 1)
+        self.required_hits[self.firm] = window + 1  # Firm is final
+        self.firm_hits = firm_threshold
+        self.window_mask = np.uint64((1 << window) - 1)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.hits = np.zeros(capacity, dtype=int)
+        self.misses = np.zeros(capacity, dtype=int)
+        self.history = np.zeros(capacity, dtype=np.uint64)
+
+    def start(self, track_id):
+        # Resets an ID for a new track in the first state; its first hit comes with the next step
+        if track_id >= len(self.state):
+            capacity = max(2 * len(self.state), track_id + 1)
+            for name in ('state', 'hits', 'misses', 'history'):
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:len(old)] = old
+                setattr(self, name, new)
+        self.state[track_id] = 0
+        self.hits[track_id] = 0
+        self.misses[track_id] = 0
+        self.history[track_id] = 0
+
+    def step(self, hit_ids, miss_ids):
+        # Records a hit or miss for every touched track and returns (track ID, new state) of those that moved
+        ids = np.concatenate([np.asarray(hit_ids, dtype=int), np.asarray(miss_ids, dtype=int)])
+        hit = np.arange(len(ids)) < len(hit_ids)
+        self.history[ids] = ((self.history[ids] << np.uint64(1)) | hit.astype(np.uint64)) & self.window_mask
+        self.hits[ids] += hit
+        self.misses[ids] += ~hit
+
+        window_hits = popcount(self.history[ids])
+        state = self.state[ids].astype(int)
+        new_state = np.where(window_hits >= self.firm_hits, self.firm,
+                             np.where(window_hits >= self.required_hits[state], self.next_state[state], state))
+        self.state[ids] = new_state
+        moved = np.flatnonzero(new_state != state)
+        return [(ids[i].item(), self.states[new_state[i]]) for i in moved.tolist()]
+
+
+def initialize_filter_state(kalman_filter, slot, x, y, z, vx, vy, vz, time):
+    kalman_filter.initialize_filter_state(slot, x, y, z, vx, vy, vz, time)
+
+
+def k_best_assignments(cost, k):
+    # Murty's ranked assignment over linear_sum_assignment: the k cheapest
+    # assignments of every row of cost to a distinct column (np.inf marks a
+    # forbidden pair), cheapest first, as (total cost, column of each row)
+    from scipy.optimize import linear_sum_assignment
+    n_rows, n_columns = cost.shape
+
+    def solve(matrix, columns, fixed):
+        # Rows before `fixed` keep their columns; only the rest is re-solved
+        free = np.ones(n_columns, dtype=bool)
+        free[columns[:fixed]] = False
+        free = np.flatnonzero(free)
+        try:
+            rows, sub_columns = linear_sum_assignment(matrix[fixed:, free])
+        except ValueError:  # No assignment avoids the forbidden pairs
+            return None
+        solution = np.concatenate([columns[:fixed], free[sub_columns]])
+        return cost[np.arange(n_rows), solution].sum(), solution
+
+    first = solve(cost, np.zeros(0, dtype=int), 0)
+    if first is None:
+        return []
+    # Each node is a subproblem whose rows before `fixed` are forced to its
+    # solution, with its forbidden pairs set to np.inf in its matrix
+    heap = [(first[0], 0, first[1], cost, 0)]
+    pushed = 1
+    ranked = []
+    while heap and len(ranked) < k:
+        total, _, columns, matrix, fixed = heapq.heappop(heap)
+        ranked.append((total, columns))
+        # Partition the rest of the node: child i keeps rows fixed..i-1 of this
+        # solution and forbids the column row i took in it
+        for i in range(fixed, n_rows):
+            child = matrix.copy()
+            child[i, columns[i]] = np.inf
+            solution = solve(child, columns, i)
+            if solution is not None:
+                heapq.heappush(heap, (solution[0], pushed, solution[1], child, i))
+                pushed += 1
+    return ranked
+
+
+# Joint probabilistic data association. A joint event gives every track of a
+# cluster one of its gated reports or a missed detection, with no report used
+# twice, and is weighted by
+#   prod over detections of Pd * g(z) / clutter_density * prod over misses of (1 - Pd)
+# where g is the Gaussian likelihood N(z; H x, S). The clutter density is taken
+# as clutter_per_gate false reports in each track's gate volume, which keeps the
+# weights independent of the position units. Tracks still in initiation have no
+# velocity yet, so their S is inflated until the gate is its initiation_gate_probability region.
+# The association probabilities (beta) are the normalized sums of the event weights.
+# Clusters with more than max_enumerated_tracks tracks are not enumerated; the
+# k_best most likely events from Murty's ranked assignment approximate them instead.
+class JPDAEngine:
+    def __init__(self, detection_probability=0.9, clutter_per_gate=1.0, max_hypotheses=10000, prune_log_ratio=10.0,
+                 initiation_gate_probability=0.99, max_enumerated_tracks=8, k_best=100):
+        self.detection_probability = detection_probability  # Must stay below 1 so that a miss is always feasible
+        self.clutter_per_gate = clutter_per_gate  # Expected false reports inside one track's gate
+        self.max_hypotheses = max_hypotheses  # Joint events enumerated per cluster at most
+        self.prune_log_ratio = prune_log_ratio  # Skip branches that cannot come within exp(-ratio) of the best event
+        self.initiation_gate_probability = initiation_gate_probability  # Share of an initiating track's inflated Gaussian inside its gate
+        self.max_enumerated_tracks = max_enumerated_tracks
+        self.k_best = k_best  # Events ranked per cluster above max_enumerated_tracks
+        self.cluster_stats = []  # Per-cluster size, method, hypothesis count and time of the last scan
+        self.total_clusters = 0
+        self.total_hypotheses = 0
+        self.total_seconds = 0.0
+
+    def enumerate_events(self, scores):
+        # Depth-first search over the tracks of one cluster. scores is the (t, r)
+        # log weight of giving report j to track i, -inf outside the gate.
+        # Returns the events as a (n_events, t) array of report indices (-1 for
+        # a miss), their log weights and whether max_hypotheses cut the search short
+        n_tracks, n_reports = scores.shape
+        miss = np.log1p(-self.detection_probability)
+        options = []
+        for i in range(n_tracks):
+            gated = np.flatnonzero(np.isfinite(scores[i]))
+            track_options = [(j, scores[i, j]) for j in gated.tolist()] + [(-1, miss)]
+            # Likeliest options first, so the first events found are the heaviest
+            track_options.sort(key=lambda option: -option[1])
+            options.append(track_options)
+        # What a detection adds over a miss; zero outside the gate
+        gain = np.maximum(scores - miss, 0)
+
+        def bound(i, free):
+            # Upper bound on what tracks i.. can still add with the free reports:
+            # the better of letting every track take its best report and letting
+            # every report go to its best track, both ignoring the other conflict
+            rest = gain[i:][:, free]
+            if rest.size == 0:
+                return (n_tracks - i) * miss
+            return (n_tracks - i) * miss + min(rest.max(axis=1).sum(), rest.max(axis=0).sum())
+
+        events = []
+        weights = []
+        assignment = [-1] * n_tracks
+        free = np.ones(n_reports, dtype=bool)
+        best = -np.inf
+        truncated = False
+
+        def descend(i, weight):
+            nonlocal best, truncated
+            if i == n_tracks:
+                events.append(tuple(assignment))
+                weights.append(weight)
+                best = max(best, weight)
+                truncated = len(events) >= self.max_hypotheses
+                return
+            for j, score in options[i]:
+                if truncated:
+                    break
+                if j >= 0 and not free[j]:
+                    continue
+                if j >= 0:
+                    free[j] = False
+                if weight + score + bound(i + 1, free) >= best - self.prune_log_ratio:
+                    assignment[i] = j
+                    descend(i + 1, weight + score)
+                if j >= 0:
+                    free[j] = True
+            assignment[i] = -1
+
+        descend(0, 0.0)
+        return np.array(events, dtype=int).reshape(-1, n_tracks), np.array(weights), truncated
+
+    def ranked_events(self, scores):
+        # Same result as enumerate_events, limited to the k_best heaviest events.
+        # Track i takes report column j < r or its own miss column r + i
+        n_tracks, n_reports = scores.shape
+        cost = np.full((n_tracks, n_reports + n_tracks), np.inf)
+        cost[:, :n_reports] = -scores
+        cost[np.arange(n_tracks), n_reports + np.arange(n_tracks)] = -np.log1p(-self.detection_probability)
+        ranked = k_best_assignments(cost, self.k_best)
+        events = np.array([columns for _, columns in ranked], dtype=int).reshape(-1, n_tracks)
+        events[events >= n_reports] = -1
+        return events, -np.array([total for total, _ in ranked]), len(ranked) >= self.k_best
+
+    def marginals(self, events, log_weights, n_reports):
+        # Event probabilities normalized in log space, and beta[i, j] = P(report j
+        # belongs to track i) with the missed-detection probability in column n_reports
+        probabilities = np.exp(log_weights - log_weights.max())
+        probabilities /= probabilities.sum()
+        n_tracks = events.shape[1]
+        beta = np.zeros((n_tracks, n_reports + 1))
+        columns = np.where(events < 0, n_reports, events)
+        np.add.at(beta, (np.broadcast_to(np.arange(n_tracks), events.shape), columns), probabilities[:, None])
+        return probabilities, beta
+
+    def pair_scores(self, pairs, initiating=None):
+        # log(Pd * g(z) / clutter_density) of the gated pairs
+        gate, track_idx, distances = pairs.gate, pairs.track_idx, pairs.distances
+        log_gate_volume = (np.log(4 * np.pi / 3) + 1.5 * np.log(gate.gate_threshold)
+                           + gate.half_log_det[track_idx])
+        log_likelihood = pairs.log_likelihood
+        if initiating is not None:
+            from scipy.special import gammaincinv
+            # chi2.ppf(p, 3) == 2 * gammaincinv(1.5, p)
+            scale = gate.gate_threshold / (2 * gammaincinv(1.5, self.initiation_gate_probability))
+            inflated = log_likelihood - 0.5 * distances * (1 / scale - 1) - 1.5 * np.log(scale)
+            log_likelihood = np.where(initiating[track_idx], inflated, log_likelihood)
+        return (log_likelihood + log_gate_volume
+                + np.log(self.detection_probability) - np.log(self.clutter_per_gate))
+
+    def associate(self, pairs, initiating=None):
+        # One (tracks, reports, events, probabilities, beta) tuple per cluster,
+        # with tracks and reports as scan-wide index arrays and events, beta
+        # indexed locally within the cluster. initiating optionally flags the
+        # gate's tracks that have no velocity estimate yet
+        clusters = pairs.clusters
+        pair_scores = self.pair_scores(pairs, initiating)
+
+        self.cluster_stats = []
+        results = []
+        for (cluster_tracks, cluster_reports), members in zip(clusters, pairs.cluster_pairs):
+            start = perf_counter()
+            scores = np.full((len(cluster_tracks), len(cluster_reports)), -np.inf)
+            scores[np.searchsorted(cluster_tracks, pairs.track_idx[members]),
+                   np.searchsorted(cluster_reports, pairs.report_idx[members])] = pair_scores[members]
+            if len(cluster_tracks) > self.max_enumerated_tracks:
+                method = 'murty'
+                events, log_weights, truncated = self.ranked_events(scores)
+            else:
+                method = 'dfs'
+                events, log_weights, truncated = self.enumerate_events(scores)
+            probabilities, beta = self.marginals(events, log_weights, len(cluster_reports))
+            results.append((cluster_tracks, cluster_reports, events, probabilities, beta))
+
+            seconds = perf_counter() - start
+            self.cluster_stats.append({'tracks': len(cluster_tracks), 'reports': len(cluster_reports), 'method': method,
+                                       'hypotheses': len(events), 'truncated': truncated, 'seconds': seconds})
+            self.total_hypotheses += len(events)
+            self.total_seconds += seconds
+        self.total_clusters += len(clusters)
+        return results
+
+
+def jpda_update_inputs(betas, track_ids, reports):
+    # Zero-padded (n, k, 3) reports and (n, k) weights for pda_update_step
+    width = max((len(betas[track_id][0]) for track_id in track_ids), default=0)
+    report_positions = np.asarray(reports, dtype=float)
+    Z = np.zeros((len(track_ids), width, 3))
+    weights = np.zeros((len(track_ids), width))
+    for n, track_id in enumerate(track_ids):
+        report_idx, beta, _ = betas[track_id]
+        Z[n, :len(report_idx)] = report_positions[report_idx]
+        weights[n, :len(report_idx)] = beta
+    return Z, weights
+
+
+def perform_jpda(pairs, reports, engine=None, initiating=None):
+    engine = engine if engine is not None else JPDAEngine()
+    gate = pairs.gate
+    results = engine.associate(pairs, initiating)
+    clusters = []
+    best_reports = []  # (track ID, report index) of the most probable joint events
+    hypotheses = []
+    probabilities = []
+    betas = {}  # Track ID -> (gated report indices, their beta, missed-detection beta)
+
+    for cluster_tracks, cluster_reports, events, event_probabilities, beta in results:
+        clusters.append((gate.track_ids[cluster_tracks], cluster_reports))
+        # Events as scan-wide report indices per track, -1 for a miss
+        hypotheses.append(np.where(events >= 0, cluster_reports[np.maximum(events, 0)], -1))
+        probabilities.append(event_probabilities.tolist())
+
+        cluster_ids = gate.track_ids[cluster_tracks].tolist()
+        for i, track_id in enumerate(cluster_ids):
+            associated = np.flatnonzero(beta[i, :-1])
+            betas[track_id] = (cluster_reports[associated], beta[i, associated], beta[i, -1])
+
+        # The most probable joint event decides which reports the tracks take
+        best_event = events[np.argmax(event_probabilities)]
+        for track_id, j in zip(cluster_ids, best_event.tolist()):
+            if j >= 0:
+                best_reports.append((track_id, cluster_reports[j].item()))
+
+    # Log clusters, hypotheses, and probabilities
+    print("JPDA Clusters:", clusters)
+    print("JPDA Hypotheses per cluster:", [len(h) for h in hypotheses])
+    print("JPDA Cluster timing:", [(stats['tracks'], stats['reports'], stats['method'], stats['hypotheses'],
+                                    round(stats['seconds'], 6))
+                                   for stats in engine.cluster_stats])
+    print("JPDA Best Reports:", [(track_id, reports[j]) for track_id, j in best_reports])
+
+    return clusters, best_reports, hypotheses, probabilities, betas
+
+def munkres_cost_matrix(distances, miss_cost, new_track_cost):
+    # Square GNN cost matrix of one cluster from its (t, r) squared distances
+    # (np.inf outside the gate):
+    #   [ distances         | miss_cost on the diagonal ]   t track rows
+    #   [ new_track_cost on |            0              ]   r dummy rows
+    #   [ the diagonal      |                           ]
+    # A track left on its dummy column is a missed detection; a report taken by
+    # its dummy row starts a new track
+    n_tracks, n_reports = distances.shape
+    cost = np.full((n_tracks + n_reports, n_reports + n_tracks), np.inf)
+    cost[:n_tracks, :n_reports] = distances
+    cost[np.arange(n_tracks), n_reports + np.arange(n_tracks)] = miss_cost
+    cost[n_tracks + np.arange(n_reports), np.arange(n_reports)] = new_track_cost
+    cost[n_tracks:, n_reports:] = 0
+    return cost
+
+
+# Solves one cluster of munkres_cost_matrix with linear_sum_assignment. Its
+# stats are the clusters solved and the solve time.
+class LSAAssigner:
+    def __init__(self):
+        self.scan_stats = []  # Clusters and solve time of every scan
+        self.totals = {'clusters': 0, 'seconds': 0.0}
+
+    def start_scan(self, track_ids):
+        pass
+
+    def finish_scan(self, clusters, seconds):
+        self.scan_stats.append({'clusters': clusters, 'seconds': seconds})
+        self.totals['clusters'] += clusters
+        self.totals['seconds'] += seconds
+
+    def describe(self, stats):
+        return f"{stats['clusters']} clusters, {stats['seconds']:.6f} s"
+
+    def solve(self, n_tracks, n_reports, track_idx, report_idx, distances, miss_cost, new_track_cost, track_ids):
+        # Gated pairs in cluster-local indices -> assigned (track, report) pairs
+        from scipy.optimize import linear_sum_assignment
+        cluster_distances = np.full((n_tracks, n_reports), np.inf)
+        cluster_distances[track_idx, report_idx] = distances
+        row_ind, col_ind = linear_sum_assignment(munkres_cost_matrix(cluster_distances, miss_cost, new_track_cost))
+        assigned = (row_ind < n_tracks) & (col_ind < n_reports)
+        return list(zip(row_ind[assigned].tolist(), col_ind[assigned].tolist()))
+
+
+# Forward auction (Bertsekas) on the same square problem as munkres_cost_matrix,
+# built from the gated pairs only. Persons are the reports plus one
+# missed-detection person per track; objects are the tracks plus one new-track
+# object per report. Prices are kept by track ID from one scan to the next:
+# the track's own and the level its cluster's new-track objects settled at,
+# which every new-track object of the next cluster starts from. A track that
+# took a report last scan also starts out holding its nearest report when that
+# is consistent with the prices. Any starting prices keep the result within
+# (t + r) * epsilon of the optimum. Its stats also count the bids, the
+# auction's own measure of work, which linear_sum_assignment has no match for.
+class AuctionAssigner:
+    def __init__(self, epsilon=1e-2, scaling=8.0, warm_phases=3):
+        self.epsilon = epsilon  # Final bid increment, in squared-distance units
+        self.scaling = scaling  # Epsilon reduction per phase
+        self.warm_phases = warm_phases  # Phases above epsilon when every track's prices carry over
+        self.prices = {}  # Track ID -> (track price, new-track price level) at the end of the previous scan
+        self.assigned = set()  # Track IDs that took a report in the previous scan
+        self.previous = set()
+        self.scan_stats = []  # Clusters, bids and solve time of every scan
+        self.totals = {'clusters': 0, 'bids': 0, 'seconds': 0.0}
+        self.bids = 0  # Bids of the current scan
+
+    def start_scan(self, track_ids):
+        present = set(np.asarray(track_ids).tolist())
+        self.prices = {track_id: price for track_id, price in self.prices.items() if track_id in present}
+        self.previous = self.assigned
+        self.assigned = set()
+        self.bids = 0
+
+    def finish_scan(self, clusters, seconds):
+        self.scan_stats.append({'clusters': clusters, 'bids': self.bids, 'seconds': seconds})
+        self.totals['clusters'] += clusters
+        self.totals['bids'] += self.bids
+        self.totals['seconds'] += seconds
+
+    def describe(self, stats):
+        return f"{stats['clusters']} clusters, {stats['bids']} bids, {stats['seconds']:.6f} s"
+
+    def solve(self, n_tracks, n_reports, track_idx, report_idx, distances, miss_cost, new_track_cost, track_ids):
+        # Gated pairs in cluster-local indices -> assigned (track, report) pairs
+        if not (np.all(np.isfinite(distances)) and np.isfinite(miss_cost) and np.isfinite(new_track_cost)):
+            raise ValueError("Auction costs must be finite.")
+        # Every person's objects and values (negated costs)
+        objects = []
+        values = []
+        order = np.argsort(report_idx, kind='stable')
+        bounds = np.searchsorted(report_idx[order], np.arange(n_reports + 1))
+        for j in range(n_reports):
+            pairs = order[bounds[j]:bounds[j + 1]]
+            objects.append(np.append(track_idx[pairs], n_tracks + j))
+            values.append(np.append(-distances[pairs], -new_track_cost))
+        new_track_objects = n_tracks + np.arange(n_reports)
+        for i in range(n_tracks):
+            objects.append(np.append(i, new_track_objects))
+            values.append(np.append(-miss_cost, np.zeros(n_reports)))
+        n_persons = n_reports + n_tracks
+
+        prices = np.zeros(n_tracks + n_reports)
+        warm = [self.prices[track_id] for track_id in track_ids if track_id in self.prices]
+        for i, track_id in enumerate(track_ids):
+            if track_id in self.prices:
+                prices[i] = self.prices[track_id][0]
+        if warm:
+            prices[n_tracks:] = max(level for _, level in warm)
+        epsilon = max(max(miss_cost, new_track_cost, distances.max(initial=0)) / 2, self.epsilon)
+        if len(warm) == n_tracks:
+            epsilon = min(epsilon, self.epsilon * self.scaling ** self.warm_phases)
+
+        while True:
+            owner = [-1] * (n_tracks + n_reports)
+            assignment = [-1] * n_persons
+            if epsilon <= self.epsilon:
+                epsilon = self.epsilon
+                self.seed(n_tracks, track_idx, report_idx, distances, track_ids, objects, values, prices,
+                          owner, assignment)
+            queue = [p for p in range(n_persons) if assignment[p] < 0]
+            while queue:
+                person = queue.pop()
+                person_objects = objects[person]
+                profits = values[person] - prices[person_objects]
+                best = np.argmax(profits)
+                best_profit = profits[best]
+                profits[best] = -np.inf
+                # Raise the price to where the second best object would be as good, plus epsilon;
+                # a person with a single object (a report no track gates) bids epsilon
+                second_profit = profits.max() if len(profits) > 1 else best_profit
+                target = person_objects[best]
+                prices[target] += best_profit - second_profit + epsilon
+                if owner[target] >= 0:
+                    assignment[owner[target]] = -1
+                    queue.append(owner[target])
+                owner[target] = person
+                assignment[person] = target
+                self.bids += 1
+            if epsilon <= self.epsilon:
+                break
+            epsilon /= self.scaling
+
+        pairs = [(assignment[j], j) for j in range(n_reports) if assignment[j] < n_tracks]
+        prices -= prices.min()
+        new_track_level = prices[n_tracks:].min(initial=np.inf) if n_reports else 0.0
+        for i, track_id in enumerate(track_ids):
+            self.prices[track_id] = (prices[i], new_track_level)
+        self.assigned.update(track_ids[i] for i, _ in pairs)
+        return pairs
+
+    def seed(self, n_tracks, track_idx, report_idx, distances, track_ids, objects, values, prices, owner, assignment):
+        # Tracks assigned last scan start out holding their nearest report, as
+        # long as that report could not do better than epsilon elsewhere
+        order = np.lexsort((distances, track_idx))
+        first = order[np.flatnonzero(np.diff(track_idx[order], prepend=-1))]
+        for i, j in zip(track_idx[first].tolist(), report_idx[first].tolist()):
+            if track_ids[i] not in self.previous or assignment[j] >= 0 or owner[i] >= 0:
+                continue
+            profits = values[j] - prices[objects[j]]
+            held = profits[np.flatnonzero(objects[j] == i)[0]]
+            if held >= profits.max() - self.epsilon:
+                owner[i] = j
+                assignment[j] = i
+
+
+ASSIGNMENT_SOLVERS = {'lsa': LSAAssigner, 'auction': AuctionAssigner}
+
+
+def assign_clusters(assigner, clusters, track_idx, report_idx, costs, miss_cost, new_track_cost, track_ids,
+                    members=None):
+    # Runs the assigner on every cluster's pairs and records the scan's
+    # stats on it. Returns (track index, report index) pairs, scan-wide.
+    # members optionally gives each cluster's pair indices
+    assignments = []
+    start = perf_counter()
+    assigner.start_scan(track_ids)
+    members = cluster_pairs(clusters, track_idx, len(track_ids)) if members is None else members
+    for (cluster_tracks, cluster_reports), pairs in zip(clusters, members):
+        assigned = assigner.solve(
+            len(cluster_tracks), len(cluster_reports), np.searchsorted(cluster_tracks, track_idx[pairs]),
+            np.searchsorted(cluster_reports, report_idx[pairs]), costs[pairs], miss_cost, new_track_cost,
+            track_ids[cluster_tracks].tolist())
+        assignments.extend((cluster_tracks[row].item(), cluster_reports[col].item()) for row, col in assigned)
+    assigner.finish_scan(len(clusters), perf_counter() - start)
+    return assignments
+
+
+def perform_munkres(pairs, reports, miss_cost=None, new_track_cost=None, assigner=None):
+    # Global nearest neighbour, solved separately on every gated cluster.
+    # By default a missed detection and a new track together cost as much as
+    # a pair on the gate boundary, so every gated pair that fits is taken.
+    # Returns (track ID, report index) pairs
+    gate = pairs.gate
+    miss_cost = gate.gate_threshold / 2 if miss_cost is None else miss_cost
+    new_track_cost = gate.gate_threshold / 2 if new_track_cost is None else new_track_cost
+    assigner = assigner if assigner is not None else LSAAssigner()
+    clusters = pairs.clusters
+
+    assigned = assign_clusters(assigner, clusters, pairs.track_idx, pairs.report_idx, pairs.distances, miss_cost,
+                               new_track_cost, gate.track_ids, pairs.cluster_pairs)
+    assignments = [(gate.track_ids[track].item(), report) for track, report in assigned]
+
+    # Log clusters and assignments
+    print("Munkres Clusters:", [(len(cluster_tracks), len(cluster_reports)) for cluster_tracks, cluster_reports in clusters])
+    print("Munkres Assignments:", assignments)
+    print(f"Munkres Solver: {type(assigner).__name__}, {assigner.describe(assigner.scan_stats[-1])}")
+    print("Munkres Best Reports:", [(track_id, reports[j]) for track_id, j in assignments])
+
+    return assignments
+
+
+# Track-oriented MHT. Every Firm track keeps a compact hypothesis tree: only
+# its leaves, each with its own TrackStateStore slot, a log score and its
+# report choices over the last n_scan scans (older choices are common to all
+# leaves). Each scan every leaf branches into a miss and one child per gated
+# report. The assignment solver picks the best global hypothesis: one child
+# per track, no report taken twice. Children are then pruned to those that
+# agree with it n_scan scans back, score within prune_log_ratio of it and rank
+# among the max_leaves best of their track. Tracks still in initiation take
+# part with their single state.
+class TrackOrientedMHT:
+    def __init__(self, kalman_filter, engine=None, assigner=None, n_scan=3, max_leaves=16, prune_log_ratio=10.0,
+                 cascade=None):
+        self.kalman_filter = kalman_filter
+        self.engine = engine if engine is not None else JPDAEngine()  # Detection probability, clutter and pair scores
+        self.assigner = assigner if assigner is not None else LSAAssigner()
+        self.n_scan = n_scan  # Scans a report choice stays open
+        self.max_leaves = max_leaves  # Leaves kept per track
+        self.prune_log_ratio = prune_log_ratio  # Drop leaves this far (in log score) below the chosen one
+        self.cascade = cascade  # Optional GateCascade run ahead of the leaves' Mahalanobis gate
+        self.leaves = {}  # Firm track ID -> [(slot, score, history)], chosen leaf first, scores relative to it
+        self.scan_stats = []  # Leaves, children and time of every scan
+        self.total_seconds = 0.0
+        self.pairs = None  # Last scan's leaf pair scores
+        self.chosen_leaves = {}  # Track ID -> leaf (gate index in pairs) behind its chosen report, last scan
+
+    def release(self, track_id):
+        # Frees every leaf slot of a deleted track
+        for slot, _, _ in self.leaves.pop(track_id, []):
+            self.kalman_filter.store.free(slot)
+
+    def associate(self, tracks, firm_ids, reports, current_time, report_ranges=None, report_doppler=None):
+        # Returns (track ID, report index) for every track the global hypothesis gives
+        # a report, with the Firm tracks' leaves already updated and each Firm
+        # track's 'slot' pointing at its chosen leaf. The reports' measured
+        # ranges and Doppler feed the cascade, when there is one
+        start = perf_counter()
+        store = self.kalman_filter.store
+        miss = np.log1p(-self.engine.detection_probability)
+        track_ids = np.array([track['track_id'] for track in tracks], dtype=int)
+        firm = np.array([track_id in firm_ids for track_id in track_ids.tolist()], dtype=bool)
+
+        leaf_slots, leaf_rows, leaf_scores, leaf_histories = [], [], [], []
+        for row, track in enumerate(tracks):
+            if firm[row]:
+                leaves = self.leaves.setdefault(track['track_id'], [(track['slot'], 0.0, ())])
+            else:
+                leaves = [(track['slot'], 0.0, ())]
+            for slot, score, history in leaves:
+                leaf_slots.append(slot)
+                leaf_rows.append(row)
+                leaf_scores.append(score)
+                leaf_histories.append(history)
+        leaf_slots = np.array(leaf_slots, dtype=int)
+        leaf_rows = np.array(leaf_rows, dtype=int)
+        leaf_scores = np.array(leaf_scores)
+
+        gate = ScanGate(self.kalman_filter, leaf_slots, current_time, track_ids[leaf_rows])
+        if self.cascade is not None and report_ranges is not None:
+            pairs = self.cascade.score(gate, reports, report_ranges, report_doppler)
+        else:
+            pairs = gate.score(reports)
+        leaf_idx, report_idx = pairs.track_idx, pairs.report_idx
+        # Children: one miss per leaf, then one per gated (leaf, report) pair
+        child_leaf = np.concatenate([np.arange(len(leaf_slots)), leaf_idx])
+        child_report = np.concatenate([np.full(len(leaf_slots), -1), report_idx])
+        child_score = np.concatenate([leaf_scores + miss, leaf_scores[leaf_idx] + self.engine.pair_scores(
+            pairs, ~firm[leaf_rows])])
+        child_row = leaf_rows[child_leaf]
+
+        # Best child of every track per gated report and for a miss
+        row_miss = np.full(len(tracks), -np.inf)
+        np.maximum.at(row_miss, child_row[:len(leaf_slots)], child_score[:len(leaf_slots)])
+        keys, inverse = np.unique(child_row[len(leaf_slots):] * len(reports) + report_idx, return_inverse=True)
+        option_scores = np.full(len(keys), -np.inf)
+        np.maximum.at(option_scores, inverse, child_score[len(leaf_slots):])
+        option_rows, option_reports = np.divmod(keys, len(reports))
+
+        # Global hypothesis: a track takes a report when that beats its miss,
+        # with the gains shifted so the solver sees non-negative costs
+        gain = option_scores - row_miss[option_rows]
+        shift = max(gain.max(initial=0.0), 0.0)
+        clusters = clusters_from_pairs(option_rows, option_reports, len(tracks), len(reports))
+        chosen_report = np.full(len(tracks), -1)
+        for row, report in assign_clusters(self.assigner, clusters, option_rows, option_reports, shift - gain,
+                                           shift / 2, shift / 2, track_ids):
+            chosen_report[row] = report
+
+        # Surviving children of every Firm track, best first
+        order = np.lexsort((-child_score, child_row))
+        bounds = np.searchsorted(child_row[order], np.arange(len(tracks) + 1))
+        survivors = []  # (row, leaf, report, score, history, chosen)
+        self.pairs = pairs
+        self.chosen_leaves = {}
+        for row in np.flatnonzero(chosen_report >= 0).tolist():
+            children = np.flatnonzero((child_row == row) & (child_report == chosen_report[row]))
+            self.chosen_leaves[track_ids[row].item()] = child_leaf[children[np.argmax(child_score[children])]].item()
+        for row in np.flatnonzero(firm).tolist():
+            children = order[bounds[row]:bounds[row + 1]]
+            chosen = children[np.flatnonzero(child_report[children] == chosen_report[row])[0]]
+            chosen_history = leaf_histories[child_leaf[chosen]] + (child_report[chosen].item(),)
+            kept = []
+            for child in [chosen] + [c for c in children.tolist() if c != chosen]:
+                if len(kept) >= self.max_leaves or child_score[child] < child_score[chosen] - self.prune_log_ratio:
+                    break
+                history = leaf_histories[child_leaf[child]] + (child_report[child].item(),)
+                if len(history) > self.n_scan:
+                    if history[0] != chosen_history[0]:
+                        continue  # N-scan pruning: the choice n_scan scans back is now fixed
+                    history = history[1:]
+                kept.append((row, child_leaf[child].item(), child_report[child].item(),
+                             child_score[child] - child_score[chosen], history, child == chosen))
+            survivors.extend(kept)
+
+        # A child reuses its parent's slot when it is the parent's first
+        # survivor, preferring the miss; the others branch into cloned slots
+        survivors.sort(key=lambda child: (child[1], child[2] >= 0))
+        parents = [child[1] for child in survivors]
+        first = np.flatnonzero(np.diff(parents, prepend=-1)) if survivors else np.zeros(0, dtype=int)
+        child_slots = leaf_slots[parents] if survivors else np.zeros(0, dtype=int)
+        branching = np.setdiff1d(np.arange(len(survivors)), first)
+        child_slots[branching] = store.clone(child_slots[branching])
+        for leaf in np.setdiff1d(np.flatnonzero(firm[leaf_rows]), parents).tolist():
+            store.free(leaf_slots[leaf])
+
+        updated = [i for i, child in enumerate(survivors) if child[2] >= 0]
+        self.kalman_filter.update_step(child_slots[updated], [reports[survivors[i][2]] for i in updated])
+
+        for row in np.flatnonzero(firm).tolist():
+            self.leaves[track_ids[row].item()] = []
+        for slot, (row, _, _, score, history, chosen) in zip(child_slots.tolist(), survivors):
+            leaves = self.leaves[track_ids[row].item()]
+            if chosen:
+                leaves.insert(0, (slot, score, history))
+                tracks[row]['slot'] = slot
+            else:
+                leaves.append((slot, score, history))
+
+        seconds = perf_counter() - start
+        n_leaves = sum(len(self.leaves[track_id]) for track_id in track_ids[firm].tolist())
+        self.scan_stats.append({'leaves': n_leaves, 'children': len(child_score), 'seconds': seconds})
+        self.total_seconds += seconds
+        print(f"MHT: {len(leaf_slots)} leaves, {len(child_score)} children, {n_leaves} kept, {seconds:.6f} s")
+
+        return [(track_ids[row].item(), report) for row, report in enumerate(chosen_report.tolist()) if report >= 0]
+
+
+# Track IDs from a free list, so allocate and release are O(1). A released ID
+# can sit in quarantine for a while before it is handed out again, so that
+# consumers of the output do not mistake a new track for one just dropped.
+# entries is the per-ID {'id', 'state', 'slot'} list main reports from.
+class TrackIDAllocator:
+    def __init__(self, quarantine=0.0):
+        self.quarantine = quarantine  # Seconds a released ID waits before reuse
+        self.entries = []
+        self.free_ids = []  # Stack of reusable IDs
+        self.quarantined = deque()  # (release time, ID), oldest first
+        self.occupied = 0
+        self.peak = 0
+        self.allocations = 0
+        self.reuses = 0
+
+    def allocate(self, current_time):
+        # Releases whose quarantine has ended become reusable first
+        while self.quarantined and self.quarantined[0][0] + self.quarantine <= current_time:
+            self.free_ids.append(self.quarantined.popleft()[1])
+        if self.free_ids:
+            track_id = self.free_ids.pop()
+            self.entries[track_id]['state'] = 'occupied'
+            self.reuses += 1
+        else:
+            track_id = len(self.entries)
+            self.entries.append({'id': track_id, 'state': 'occupied'})
+        self.allocations += 1
+        self.occupied += 1
+        self.peak = max(self.peak, self.occupied)
+        return track_id
+
+    def release(self, track_id, current_time):
+        if self.entries[track_id]['state'] == 'free':
+            return
+        self.entries[track_id]['state'] = 'free'
+        self.occupied -= 1
+        if self.quarantine > 0:
+            self.quarantined.append((current_time, track_id))
+        else:
+            self.free_ids.append(track_id)
+
+    def stats(self):
+        return {'ids': len(self.entries), 'occupied': self.occupied, 'free': len(self.free_ids),
+                'quarantined': len(self.quarantined), 'peak': self.peak, 'allocations': self.allocations,
+                'reuses': self.reuses}
+
+
+# Track deletion deadlines in a min-heap keyed on expiry time. A track's
+# deadline moves every time it is updated; the superseded heap entry is left in
+# place and skipped when it surfaces (lazy invalidation), so each scan only pops
+# the tracks that have really expired. States without a timeout never expire.
+class TrackTimeoutScheduler:
+    def __init__(self, poss_timeout=20.0, firm_tent_timeout=50.0):
+        self.timeouts = {'Poss1': poss_timeout, 'Tentative1': firm_tent_timeout, 'Firm': firm_tent_timeout}
+        self.heap = []  # (deadline, sequence, track ID)
+        self.live = {}  # Track ID -> sequence number of its current heap entry
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.live)
+
+    def schedule(self, track_id, state, last_time):
+        # (Re)sets a track's deadline from the time of its last measurement
+        timeout = self.timeouts.get(state)
+        if timeout is None:
+            self.live.pop(track_id, None)
+            return
+        self.sequence += 1
+        self.live[track_id] = self.sequence
+        heapq.heappush(self.heap, (last_time + timeout, self.sequence, track_id))
+        if len(self.heap) > 2 * len(self.live) + 64:
+            # Mostly stale entries: rebuild from the live ones
+            self.heap = [entry for entry in self.heap if self.live.get(entry[2]) == entry[1]]
+            heapq.heapify(self.heap)
+
+    def cancel(self, track_id):
+        self.live.pop(track_id, None)
+
+    def expired(self, current_time):
+        # IDs of the tracks whose deadline has passed, in deadline order
+        expired = []
+        heap = self.heap
+        while heap and heap[0][0] < current_time:
+            _, sequence, track_id = heapq.heappop(heap)
+            if self.live.get(track_id) == sequence:
+                del self.live[track_id]
+                expired.append(track_id)
+        return expired
+
+
+def log_to_csv(log_file_path, data):
+    with open(log_file_path, 'a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=data.keys())
+        writer.writerow(data)
+
+
+def main(input_file, track_mode, filter_option, association_type, k_best=100, assignment_solver='lsa',
+         n_scan=3, max_leaves=16, id_quarantine=0.0, confirmation_window=32, history_depth=1000,
+         history_covariance='full', history_spill=None, log_file_path='detailed_log.csv',
+         summary_file_path='track_summary.csv'):
+    # input_file is the path of a recording, its already loaded MEASUREMENT_DTYPE
+    # array, or an iterable of time-ordered plot groups such as
+    # iter_measurement_groups yields, which are tracked while the rest of the
+    # file is still being read
+    if isinstance(input_file, (str, os.PathLike)):
+        input_file = load_measurements(input_file)
+    if isinstance(input_file, np.ndarray):
+        ingest = MeasurementIngest(input_file)
+        group_offsets = measurement_group_offsets(input_file['mt'], max_time_diff=0.050)
+        groups = ((start, input_file[start:end]) for start, end in zip(group_offsets[:-1], group_offsets[1:]))
+    else:
+        ingest = MeasurementIngest()
+        groups = ((ingest.append(group), group) for group in input_file)
+        groups = itertools.chain(list(itertools.islice(groups, 1)), groups)  # Reads the header and first group
+
+    # Initialize CSV log file, once the recording has loaded
+    with open(log_file_path, 'w', newline='') as csvfile:
+        fieldnames = ['Time', 'Measurement X', 'Measurement Y', 'Measurement Z', 'Current State',
+                      'Correlation Output', 'Associated Track ID', 'Associated Position X',
+                      'Associated Position Y', 'Associated Position Z', 'Association Type',
+                      'Clusters Formed', 'Hypotheses Generated', 'Probability of Hypothesis',
+                      'Best Report Selected', 'Mahalanobis Distance', 'Log Likelihood']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+
+    if filter_option not in TRANSITION_MODELS:
+        raise ValueError("Invalid filter option selected.")
+    track_states = TrackStateStore(TRANSITION_MODELS[filter_option][0])
+    # Track histories keep history_depth updates; older ones go to history_spill, if given
+    history_file = open(history_spill, 'wb') if history_spill else None
+    transition_cache = TransitionCache()  # Per run, so its counters cover this file only
+    kalman_filter = BatchKalmanFilter(track_states, filter_option, transition_cache)
+    jpda_engine = JPDAEngine(k_best=k_best)
+    if assignment_solver not in ASSIGNMENT_SOLVERS:
+        raise ValueError("Invalid assignment solver selected.")
+    assigner = ASSIGNMENT_SOLVERS[assignment_solver]()
+
+    tracks = []
+    track_slots = TrackSlots()  # Slot of every entry of tracks
+    track_by_id = {}  # Track ID -> entry of tracks; IDs stay stable when other tracks are deleted
+    track_ids = TrackIDAllocator(id_quarantine)
+    track_id_list = track_ids.entries
+    filter_states = []
+
+    doppler_threshold = 100
+    range_threshold = 100
+    gate_cascade = GateCascade(doppler_threshold, range_threshold)
+    mht = TrackOrientedMHT(kalman_filter, jpda_engine, assigner, n_scan=n_scan, max_leaves=max_leaves,
+                           cascade=gate_cascade)
+    firm_threshold = select_initiation_mode(track_mode)
+    association_method = association_type  # 'JPDA', 'Munkres' or 'MHT'
+
+    # Initialize variables outside the loop
+    confirmation = ConfirmationEngine(firm_threshold, confirmation_window)
+    firm_ids = set()
+    state_map = {}
+    state_transition_times = {}
+    progression_states = confirmation.states
+
+    timeouts = TrackTimeoutScheduler()
+
+    for group_idx, (group_start, group) in enumerate(groups):
+        print(f"Processing measurement group {group_idx + 1}...")
+        positions = measurement_positions(group)  # Cached Cartesian position of every plot of the group
+
+        current_time = group['mt'][0].item()
+
+        # Delete the tracks whose timeout has passed; only they leave the heap
+        expired = timeouts.expired(current_time)
+        for track_id in expired:
+            print(f"Removing track {track_id} due to timeout")
+            track = track_by_id.pop(track_id)
+            mht.release(track_id)
+            track_states.free(track['slot'])
+            track_ids.release(track_id, current_time)
+            firm_ids.discard(track_id)
+            state_map.pop(track_id, None)
+        if expired:
+            kept = np.array([track['track_id'] in track_by_id for track in tracks], dtype=bool)
+            tracks[:] = [track for track, keep in zip(tracks, kept) if keep]
+            track_slots.keep(kept)
+        scan_hits = set()  # Tracks updated or started in this group
+        scan_misses = set()  # Tracks gated in a multi-report group that got no report
+
+        if len(group) == 1 and association_method != 'MHT':  # Single measurement; MHT scores every scan
+            measurement = group[0]
+            position = positions[0]
+            # Nearest correlated track over the last-report arrays, in one pass
+            slots = track_slots.slots
+            row = gate_cascade.nearest(track_states.last_range[slots], track_states.last_report[slots],
+                                       track_states.last_doppler[slots], measurement['mr'], position,
+                                       measurement['md'])
+            assigned = row >= 0
+            if assigned:
+                track = tracks[row]
+                track_id = track['track_id']
+                current_state = state_map.get(track_id, None)
+                slot = track['slot']
+                if current_state == 'Poss1':
+                    initialize_filter_state(kalman_filter, slot, *position, 0, 0, 0, current_time)
+                elif current_state == 'Tentative1':
+                    dt = current_time - track['measurements'].last_time
+                    vx, vy, vz = (position - track_states.last_report[slot]) / dt
+                    initialize_filter_state(kalman_filter, slot, *position, vx, vy, vz, current_time)
+                elif current_state == 'Firm':
+                    kalman_filter.predict_step([slot], current_time)
+                    kalman_filter.update_step([slot], position)
+
+                track['measurements'].append(group_start, current_state)
+                track_states.record_report(slot, position, measurement['md'], measurement['mr'])
+                track['history'].append(track_states.Sf[slot], track_states.Sp[slot], track_states.Pf[slot],
+                                         track_states.Pp[slot])
+                scan_hits.add(track_id)
+
+                # Log data to CSV
+                log_data = {
+                    'Time': current_time,
+                    'Measurement X': position[0],
+                    'Measurement Y': position[1],
+                    'Measurement Z': position[2],
+                    'Current State': current_state,
+                    'Correlation Output': 'Yes',
+                    'Associated Track ID': track_id,
+                    'Associated Position X': track['Sf'][-1][0, 0],
+                    'Associated Position Y': track['Sf'][-1][1, 0],
+                    'Associated Position Z': track['Sf'][-1][2, 0],
+                    'Association Type': 'Single',
+                    'Clusters Formed': '',
+                    'Hypotheses Generated': '',
+                    'Probability of Hypothesis': '',
+                    'Best Report Selected': '',
+                    'Mahalanobis Distance': '',
+                    'Log Likelihood': ''
+                }
+                log_to_csv(log_file_path, log_data)
+
+            if not assigned:
+                new_track_id = track_ids.allocate(current_time)
+
+                slot = track_states.allocate()
+                track_id_list[new_track_id]['slot'] = slot
+                initialize_filter_state(kalman_filter, slot, *position, 0, 0, 0, current_time)
+                track_states.record_report(slot, position, measurement['md'], measurement['mr'])
+                history = TrackHistory(track_states.state_dim, history_depth, history_covariance, history_file,
+                                       new_track_id)
+                history.append(track_states.Sf[slot], track_states.Sp[slot], track_states.Pf[slot],
+                               track_states.Pp[slot])
+                tracks.append({
+                    'track_id': new_track_id,
+                    'slot': slot,
+                    'measurements': TrackMeasurements(ingest, [group_start], ['Poss1']),
+                    'current_state': 'Poss1',
+                    'history': history,
+                    'Sf': history.view('Sf'),
+                    'Sp': history.view('Sp'),
+                    'Pp': history.view('Pp'),
+                    'Pf': history.view('Pf')
+                })
+                track_slots.append(slot)
+                state_map[new_track_id] = 'Poss1'
+                state_transition_times[new_track_id] = {'Poss1': current_time}
+                track_by_id[new_track_id] = tracks[-1]
+                confirmation.start(new_track_id)
+                scan_hits.add(new_track_id)
+
+                # Log data to CSV
+                log_data = {
+                    'Time': current_time,
+                    'Measurement X': position[0],
+                    'Measurement Y': position[1],
+                    'Measurement Z': position[2],
+                    'Current State': 'Poss1',
+                    'Correlation Output': 'No',
+                    'Associated Track ID': new_track_id,
+                    'Associated Position X': '',
+                    'Associated Position Y': '',
+                    'Associated Position Z': '',
+                    'Association Type': 'New',
+                    'Clusters Formed': '',
+                    'Hypotheses Generated': '',
+                    'Probability of Hypothesis': '',
+                    'Best Report Selected': '',
+                    'Mahalanobis Distance': '',
+                    'Log Likelihood': ''
+                }
+                log_to_csv(log_file_path, log_data)
+
+        else:  # Multiple measurements
+            reports = list(map(tuple, positions.tolist()))
+            report_ranges = group['mr']
+            report_doppler = group['md']
+
+            if association_method == 'MHT':
+                # Gates and updates every leaf of the Firm tracks itself
+                firm_track_ids = {track_id for track_id, state in state_map.items() if state == 'Firm'}
+                best_reports = mht.associate(tracks, firm_track_ids, reports, current_time, report_ranges,
+                                             report_doppler)
+                pairs, gate_rows = mht.pairs, mht.chosen_leaves
+            else:
+                # Predict every track to the group time and factorize its innovation
+                # covariance once; the pair scores are computed once from it and
+                # shared by clustering, association, the Firm updates and the log
+                gate = ScanGate(kalman_filter, track_slots.slots, current_time,
+                                [track['track_id'] for track in tracks])
+                pairs = gate_cascade.score(gate, reports, report_ranges, report_doppler)
+                gate_rows = {track['track_id']: row for row, track in enumerate(tracks)}
+
+            if association_method == 'JPDA':
+                clusters, best_reports, hypotheses, probabilities, betas = perform_jpda(
+                    pairs, reports, jpda_engine, np.array([state_map.get(track['track_id']) != 'Firm' for track in tracks]))
+            elif association_method == 'Munkres':
+                best_reports = perform_munkres(pairs, reports, assigner=assigner)
+
+            # best_reports holds (track ID, report index j); the plot's ingest row is group_start + j
+
+            # Gated tracks the association left without a report missed this scan
+            scan_misses.update(pairs.gate.track_ids[pairs.track_idx].tolist())
+            scan_misses.difference_update(track_id for track_id, _ in best_reports)
+
+            # Firm tracks are updated together in one batched call
+            if association_method == 'JPDA':
+                # Beta-weighted update over every gated report of each gated Firm track,
+                # also when its most likely event is a miss; that event only decides
+                # which plot is recorded for the track
+                firm_track_ids = [track_id for track_id in betas if state_map.get(track_id, None) == 'Firm']
+                if firm_track_ids:
+                    kalman_filter.pda_update_step([track_by_id[track_id]['slot'] for track_id in firm_track_ids],
+                                                  *jpda_update_inputs(betas, firm_track_ids, reports))
+            elif association_method == 'Munkres':
+                firm_updates = [(track_by_id[track_id]['slot'], reports[j]) for track_id, j in best_reports
+                                if state_map.get(track_id, None) == 'Firm']
+                if firm_updates:
+                    kalman_filter.update_step([slot for slot, _ in firm_updates],
+                                              [report for _, report in firm_updates])
+
+            for track_id, j in best_reports:
+                best_report = reports[j]
+                current_state = state_map.get(track_id, None)
+                track = track_by_id[track_id]
+                slot = track['slot']
+                if current_state == 'Poss1':
+                    initialize_filter_state(kalman_filter, slot, *best_report, 0, 0, 0, current_time)
+                elif current_state == 'Tentative1':
+                    dt = current_time - track['measurements'].last_time
+                    vx, vy, vz = (np.array(best_report) - track_states.last_report[slot]) / dt
+                    initialize_filter_state(kalman_filter, slot, *best_report, vx, vy, vz, current_time)
+
+                track['measurements'].append(group_start + j, current_state)
+                track_states.record_report(slot, best_report, group['md'][j], group['mr'][j])
+                track['history'].append(track_states.Sf[slot], track_states.Sp[slot], track_states.Pf[slot],
+                                         track_states.Pp[slot])
+                scan_hits.add(track_id)
+                pair = pairs.lookup(gate_rows[track_id], j)
+
+                # Log data to CSV
+                log_data = {
+                    'Time': current_time,
+                    'Measurement X': best_report[0],
+                    'Measurement Y': best_report[1],
+                    'Measurement Z': best_report[2],
+                    'Current State': current_state,
+                    'Correlation Output': 'Yes',
+                    'Associated Track ID': track_id,
+                    'Associated Position X': track['Sf'][-1][0, 0],
+                    'Associated Position Y': track['Sf'][-1][1, 0],
+                    'Associated Position Z': track['Sf'][-1][2, 0],
+                    'Association Type': association_method,
+                    'Clusters Formed': '',
+                    'Hypotheses Generated': '',
+                    'Probability of Hypothesis': '',
+                    'Best Report Selected': best_report,
+                    'Mahalanobis Distance': pair[0] if pair else '',
+                    'Log Likelihood': pair[1] if pair else ''
+                }
+                log_to_csv(log_file_path, log_data)
+
+            # Handle unassigned measurements
+            assigned_reports = {j for _, j in best_reports}
+            for j, report in enumerate(reports):
+                if j not in assigned_reports:
+                    new_track_id = track_ids.allocate(current_time)
+
+                    slot = track_states.allocate()
+                    track_id_list[new_track_id]['slot'] = slot
+                    initialize_filter_state(kalman_filter, slot, *report, 0, 0, 0, current_time)
+                    track_states.record_report(slot, report, group['md'][j], group['mr'][j])
+                    history = TrackHistory(track_states.state_dim, history_depth, history_covariance, history_file,
+                                           new_track_id)
+                    history.append(track_states.Sf[slot], track_states.Sp[slot], track_states.Pf[slot],
+                                   track_states.Pp[slot])
+                    tracks.append({
+                        'track_id': new_track_id,
+                        'slot': slot,
+                        'measurements': TrackMeasurements(ingest, [group_start + j], ['Poss1']),
+                        'current_state': 'Poss1',
+                        'history': history,
+                        'Sf': history.view('Sf'),
+                        'Sp': history.view('Sp'),
+                        'Pp': history.view('Pp'),
+                        'Pf': history.view('Pf')
+                    })
+                    track_slots.append(slot)
+                    state_map[new_track_id] = 'Poss1'
+                    state_transition_times[new_track_id] = {'Poss1': current_time}
+                    track_by_id[new_track_id] = tracks[-1]
+                    confirmation.start(new_track_id)
+                    scan_hits.add(new_track_id)
+
+                    # Log data to CSV
+                    log_data = {
+                        'Time': current_time,
+                        'Measurement X': report[0],
+                        'Measurement Y': report[1],
+                        'Measurement Z': report[2],
+                        'Current State': 'Poss1',
+                        'Correlation Output': 'No',
+                        'Associated Track ID': new_track_id,
+                        'Associated Position X': '',
+                        'Associated Position Y': '',
+                        'Associated Position Z': '',
+                        'Association Type': 'New',
+                        'Clusters Formed': '',
+                        'Hypotheses Generated': '',
+                        'Probability of Hypothesis': '',
+                        'Best Report Selected': '',
+                        'Mahalanobis Distance': '',
+                        'Log Likelihood': ''
+                    }
+                    log_to_csv(log_file_path, log_data)
+
+        # Confirmation: one vectorized M-of-N step over the tracks touched in
+        # this group; the hit tracks' timeout deadlines move with their last measurement
+        for track_id, state in confirmation.step(sorted(scan_hits), sorted(scan_misses - scan_hits)):
+            state_map[track_id] = state
+            track_by_id[track_id]['current_state'] = state
+            state_transition_times.setdefault(track_id, {})[state] = current_time
+            if state == 'Firm':
+                firm_ids.add(track_id)
+        for track_id in scan_hits:
+            track = track_by_id[track_id]
+            timeouts.schedule(track_id, track['current_state'], track['measurements'].last_time)
+
+    # Prepare data for CSV
+    csv_data = []
+    for track in tracks:
+        track_id = track['track_id']
+        print(f"Track {track_id}:")
+        print(f"  Current State: {track['current_state']}")
+        print(f"  State Transition Times:")
+        for state, time in state_transition_times.get(track_id, {}).items():
+            print(f"    {state}: {time}")
+        print("  Measurement History:")
+        for state in progression_states:
+            measurements = [m for m, s in track['measurements'] if s == state][:3]
+            print(f"    {state}: {measurements}")
+        print(f"  Track Status: {track_id_list[track_id]['state']}")
+        print(f"  SF: {track['Sf']}")
+        print(f"  SP: {track['Sp']}")
+        print(f"  PF: {track['Pf']}")
+        print(f"  PP: {track['Pp']}")
+        print()
+
+        # Prepare data for CSV
+        csv_data.append({
+            'Track ID': track_id,
+            'Current State': track['current_state'],
+            'Poss1 Time': state_transition_times.get(track_id, {}).get('Poss1', ''),
+            'Tentative1 Time': state_transition_times.get(track_id, {}).get('Tentative1', ''),
+            'Firm Time': state_transition_times.get(track_id, {}).get('Firm', ''),
+            'Poss1 Measurements': str([m for m, s in track['measurements'] if s == 'Poss1'][:3]),
+            'Tentative1 Measurements': str([m for m, s in track['measurements'] if s == 'Tentative1'][:3]),
+            'Firm Measurements': str([m for m, s in track['measurements'] if s == 'Firm'][:3]),
+            'Track Status': track_id_list[track_id]['state'],
+            'SF': [sf.tolist() for sf in track['Sf']],
+            'SP': [sp.tolist() for sp in track['Sp']],
+            'PF': [pf.tolist() for pf in track['Pf']],
+            'PP': [pp.tolist() for pp in track['Pp']]
+        })
+
+    # Write to CSV
+    with open(summary_file_path, 'w', newline='') as csvfile:
+        fieldnames = ['Track ID', 'Current State', 'Poss1 Time', 'Tentative1 Time', 'Firm Time',
+                      'Poss1 Measurements', 'Tentative1 Measurements', 'Firm Measurements',
+                      'Track Status', 'SF', 'SP', 'PF', 'PP']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in csv_data:
+            writer.writerow(row)
+
+    print(f"Track summary has been written to {summary_file_path}")
+    if history_file is not None:
+        history_file.close()
+        print(f"Track history beyond {history_depth} updates has been written to {history_spill}")
+    print(f"Transition cache: {transition_cache.hits} hits, {transition_cache.misses} misses")
+    print(f"Gating: {gate_cascade.summary()}")
+    print(f"Track IDs: {track_ids.stats()}")
+    if association_method == 'JPDA':
+        print(f"JPDA: {jpda_engine.total_clusters} clusters, {jpda_engine.total_hypotheses} hypotheses, "
+              f"{jpda_engine.total_seconds:.3f} s")
+    elif association_method == 'MHT':
+        print(f"MHT: {sum(len(leaves) for leaves in mht.leaves.values())} leaves, {mht.total_seconds:.3f} s")
+    if association_method in ('Munkres', 'MHT'):
+        print(f"Assignment ({assignment_solver}): {assigner.describe(assigner.totals)}")
+
+    # Add this line at the end of the function
+    return tracks